@@ -0,0 +1,415 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from focus_files import write_atomic
+from focus_metrics import latency_summary
+
+INTERVAL_SOUND = "short_0.333_pom_cue_bell.wav"
+BREAK_SOUND = "break_meditate_cue_bell.wav"
+CONCENTRATION_SOUND = "2_min_concetration.wav"
+
+# Decoded PCM is larger than the WAV on disk once the mixer converts it; the
+# ambient track is streamed and doesn't count against this.
+DEFAULT_SOUND_BUDGET = 64 * 1024 * 1024
+
+# pygame is only imported, and the mixer only opened, when audio is first
+# needed, so neither delays the first frame
+_pygame = None
+_mixer_lock = threading.Lock()
+timings = {}  # seconds spent in "pygame_import" and "mixer_init"
+
+# A small buffer keeps cue onset latency low; devices that refuse it get the
+# fallback, then pygame's defaults. Change with configure_mixer() before the
+# first sound.
+mixer_settings = {"frequency": 44100, "size": -16, "channels": 2, "buffer": 512, "fallback_buffer": 2048}
+mixer_buffer = None  # buffer size the mixer actually opened with
+
+
+def configure_mixer(**settings):
+    mixer_settings.update(settings)
+
+
+def get_mixer():
+    global _pygame
+    with _mixer_lock:
+        if _pygame is None:
+            start = time.perf_counter()
+            import pygame
+            timings["pygame_import"] = time.perf_counter() - start
+            _pygame = pygame
+        if not _pygame.mixer.get_init():
+            start = time.perf_counter()
+            _open_mixer()
+            timings["mixer_init"] = time.perf_counter() - start
+    return _pygame.mixer
+
+
+def _open_mixer():
+    global mixer_buffer
+    settings = mixer_settings
+    for buffer in (settings["buffer"], settings["fallback_buffer"]):
+        try:
+            _pygame.mixer.init(frequency=settings["frequency"], size=settings["size"],
+                               channels=settings["channels"], buffer=buffer)
+            mixer_buffer = buffer
+            return
+        except _pygame.error:
+            continue
+    _pygame.mixer.init()
+    mixer_buffer = "default"
+
+
+def mixer_ready():
+    return _pygame is not None and bool(_pygame.mixer.get_init())
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "focus_reminder", "sounds")
+
+
+# array typecode, zero level and full scale for each pygame sample format
+SAMPLE_FORMATS = {
+    8: ("B", 128, 128),
+    -8: ("b", 0, 128),
+    16: ("H", 32768, 32768),
+    -16: ("h", 0, 32768),
+    -32: ("i", 0, 2 ** 31),
+    32: ("f", 0.0, 1.0),
+}
+
+
+def leading_silence(data, fmt, channels, threshold=0.01):
+    # Bytes of near-silence at the start of raw mixer data, on a frame boundary
+    typecode, zero, full_scale = SAMPLE_FORMATS[fmt]
+    samples = memoryview(data).cast(typecode)
+    low = zero - full_scale * threshold
+    high = zero + full_scale * threshold
+    block = 4096
+    for start in range(0, len(samples), block):
+        chunk = samples[start:start + block]
+        if min(chunk) < low or max(chunk) > high:
+            for i, sample in enumerate(chunk, start):
+                if sample < low or sample > high:
+                    return (i - i % channels) * samples.itemsize
+    return len(data)
+
+
+class SoundPreparer:
+    # Keeps every cue sound on disk already converted to the mixer's format,
+    # with leading silence trimmed, so loading it is a plain buffer read with
+    # no decoding or resampling. Entries are keyed by the source file's hash
+    # and the mixer parameters; a source is only re-hashed when its size or
+    # mtime changes.
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, cache_dir=None, trim_threshold=0.01):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.trim_threshold = trim_threshold
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+        self.hits = 0
+        self.misses = 0
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        self._write_file(self.MANIFEST, json.dumps(self._manifest, indent=1).encode("utf-8"))
+
+    def _write_file(self, name, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_atomic(os.path.join(self.cache_dir, name), data)
+
+    def _source_hash(self, path, stat):
+        entry = self._manifest.get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry["hash"]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load(self, path):
+        mixer = get_mixer()
+        freq, fmt, channels = mixer.get_init()
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            digest = self._source_hash(path, stat)
+            key = f"{digest[:20]}-{freq}-{fmt}-{channels}.pcm"
+            try:
+                with open(os.path.join(self.cache_dir, key), 'rb') as f:
+                    data = f.read()
+                self.hits += 1
+                return mixer.Sound(buffer=data)
+            except FileNotFoundError:
+                self.misses += 1
+
+            # Let the mixer decode and convert once, then keep its output
+            raw = mixer.Sound(path).get_raw()
+            data = raw[leading_silence(raw, fmt, channels, self.trim_threshold):]
+            if not data:
+                # Silent or very quiet throughout: keep it rather than an empty sound
+                data = raw
+            self._write_file(key, data)
+
+            old = self._manifest.get(path)
+            if old and old["key"] != key:
+                try:
+                    os.remove(os.path.join(self.cache_dir, old["key"]))
+                except OSError:
+                    pass
+            self._manifest[path] = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": digest, "key": key}
+            self._save_manifest()
+            return mixer.Sound(buffer=data)
+
+    def cache_size(self):
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.is_file())
+        except FileNotFoundError:
+            return 0
+
+
+class SoundBank:
+    def __init__(self, sound_folder, budget_bytes=DEFAULT_SOUND_BUDGET, preparer=None, metrics=None):
+        self.sound_folder = sound_folder
+        self.budget_bytes = budget_bytes
+        # Optional SoundPreparer that serves converted sounds from disk
+        self.preparer = preparer
+        # Optional focus_metrics.Metrics with a "sound_load" histogram
+        self.metrics = metrics
+        self.used_bytes = 0
+
+        # name -> (sound, size in bytes), least recently used first
+        self._sounds = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes disk loads so a cue requested during warm-up waits for
+        # the background load instead of decoding the same file twice
+        self._load_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_errors = {}
+        self.load_times = {}
+
+    def get(self, name):
+        sound = self._lookup(name)
+        if sound is not None:
+            return sound
+
+        with self._load_lock:
+            # Another thread may have loaded it while we were waiting
+            sound = self._lookup(name)
+            if sound is not None:
+                return sound
+
+            with self._lock:
+                self.misses += 1
+            return self._load(name)
+
+    def preload(self, names):
+        # Warm the bank in the background so the first cue doesn't hit the disk
+        thread = threading.Thread(target=self._preload, args=(list(names),))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _preload(self, names):
+        try:
+            get_mixer()
+        except Exception as e:
+            self.load_errors["mixer"] = str(e)
+            return
+        for name in names:
+            with self._load_lock:
+                with self._lock:
+                    if name in self._sounds:
+                        continue
+                try:
+                    self._load(name)
+                except Exception as e:
+                    self.load_errors[name] = str(e)
+
+    def _lookup(self, name):
+        with self._lock:
+            entry = self._sounds.get(name)
+            if entry is None:
+                return None
+            self._sounds.move_to_end(name)
+            self.hits += 1
+            return entry[0]
+
+    def _load(self, name):
+        start = time.perf_counter()
+        path = os.path.join(self.sound_folder, name)
+        if self.preparer is not None:
+            sound = self.preparer.load(path)
+        else:
+            sound = get_mixer().Sound(path)
+        elapsed = time.perf_counter() - start
+        size = sound_size(sound)
+
+        if self.metrics is not None:
+            self.metrics.observe("sound_load", elapsed * 1000)
+
+        with self._lock:
+            self.load_times[name] = elapsed
+            self.load_errors.pop(name, None)
+            self._sounds[name] = (sound, size)
+            self.used_bytes += size
+            self._evict()
+        return sound
+
+    def _evict(self):
+        # Always keep the most recently loaded sound, even if it alone is over budget
+        while self.used_bytes > self.budget_bytes and len(self._sounds) > 1:
+            _, (_, size) = self._sounds.popitem(last=False)
+            self.used_bytes -= size
+            self.evictions += 1
+
+    def discard(self, name):
+        with self._lock:
+            entry = self._sounds.pop(name, None)
+            if entry is not None:
+                self.used_bytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "used_bytes": self.used_bytes,
+                "budget_bytes": self.budget_bytes,
+                "cached": list(self._sounds),
+                "load_times": dict(self.load_times),
+                "load_errors": dict(self.load_errors),
+            }
+
+
+def sound_size(sound):
+    # Size of the decoded buffer in the mixer's sample format
+    freq, fmt, channels = get_mixer().get_init()
+    return int(sound.get_length() * freq) * channels * (abs(fmt) // 8)
+
+
+class AmbientLoop:
+    # Loops the concentration track through pygame.mixer.music, which streams
+    # the file from disk through a small buffer instead of decoding it whole,
+    # and restarts it without a gap. It has its own stop, so the cue bells
+    # are left alone.
+
+    def __init__(self, path):
+        self.path = path
+        self.playing = False
+
+    def play(self):
+        music = get_mixer().music
+        music.load(self.path)
+        music.play(loops=-1)
+        self.playing = True
+
+    def stop(self):
+        if self.playing and mixer_ready():
+            music = get_mixer().music
+            music.stop()
+            music.unload()
+        self.playing = False
+
+
+CUE_CHANNEL_INTERVAL = 0
+CUE_CHANNEL_BREAK = 1
+RESERVED_CHANNELS = 2
+
+
+class AudioChannels:
+    # Owns playback: interval and break cues each get a reserved mixer
+    # channel, so they never steal from each other or wait for a free one,
+    # and the streamed ambient loop is ducked while a cue rings. The time each
+    # cue's play call takes on the Tk thread is recorded.
+
+    def __init__(self, sound_bank, ambient, duck_volume=0.3, metrics=None):
+        self.sound_bank = sound_bank
+        self.ambient = ambient
+        self.duck_volume = duck_volume
+        # Optional focus_metrics.Metrics with a "sound_play" histogram
+        self.metrics = metrics
+        self._channels = None
+        self._lock = threading.Lock()
+        self._unduck_timer = None
+        self.latencies = deque(maxlen=256)  # seconds
+        self.cues_played = 0
+
+    def _channel(self, number):
+        mixer = get_mixer()
+        if self._channels is None:
+            # Reserved channels are skipped when Sound.play() picks one itself
+            mixer.set_reserved(RESERVED_CHANNELS)
+            self._channels = [mixer.Channel(i) for i in range(RESERVED_CHANNELS)]
+        return self._channels[number]
+
+    def play_cue(self, channel_number, name):
+        sound = self.sound_bank.get(name)
+        channel = self._channel(channel_number)
+        # The channel reports busy as soon as play() returns, so the call itself
+        # is what can be measured; the rest of the onset is the mixer buffer
+        requested = time.perf_counter()
+        channel.play(sound)
+        latency = time.perf_counter() - requested
+        self.latencies.append(latency)
+        if self.metrics is not None:
+            self.metrics.observe("sound_play", latency * 1000)
+        self.cues_played += 1
+        self._duck(sound.get_length())
+
+    def _duck(self, seconds):
+        if not self.ambient.playing:
+            return
+        with self._lock:
+            if self._unduck_timer is not None:
+                self._unduck_timer.cancel()
+            get_mixer().music.set_volume(self.duck_volume)
+            self._unduck_timer = threading.Timer(seconds, self._unduck)
+            self._unduck_timer.daemon = True
+            self._unduck_timer.start()
+
+    def _unduck(self):
+        with self._lock:
+            self._unduck_timer = None
+            if mixer_ready():
+                get_mixer().music.set_volume(1.0)
+
+    def play_ambient(self):
+        self.ambient.play()
+        with self._lock:
+            # Stay ducked if a cue is still ringing
+            get_mixer().music.set_volume(self.duck_volume if self._unduck_timer is not None else 1.0)
+
+    def stop_ambient(self):
+        with self._lock:
+            if self._unduck_timer is not None:
+                self._unduck_timer.cancel()
+                self._unduck_timer = None
+        self.ambient.stop()
+
+    def stats(self):
+        latency = latency_summary(self.latencies)
+        return {
+            "mixer_buffer": mixer_buffer,
+            "cues_played": self.cues_played,
+            "latency_ms_p50": latency["p50"] if self.latencies else None,
+            "latency_ms_max": latency["max"] if self.latencies else None,
+        }
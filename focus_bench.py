@@ -0,0 +1,885 @@
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import wave
+
+from focus_timer import DeadlineTimer, PomodoroEngine, DaySchedule, SimulatedClock, simulate_day
+from focus_report import ReportBuilder, write_synthetic_logs
+from focus_journal import (JournalReader, csv_to_journal, journal_to_csv,
+                           EVENT_IDS, RECORDS_SUFFIX, STRINGS_SUFFIX)
+from focus_checkpoint import SessionCheckpointer
+from focus_session import SessionModel
+from focus_metrics import percentile
+
+
+class LegacySleepTimer:
+    # The original run_timer loop: decrement once per time.sleep(1) and poll
+    # every half second at the boundary, kept here as a baseline.
+
+    def __init__(self, on_tick, on_expire):
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.time_remaining = 0
+        self.running = False
+        self.wakeups = 0
+
+    def start(self, seconds):
+        self.time_remaining = seconds
+        self.running = True
+        thread = threading.Thread(target=self._run)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            if self.time_remaining > 0:
+                self.time_remaining -= 1
+                self.on_tick(self.time_remaining)
+                time.sleep(1)
+            else:
+                self.on_expire()
+                time.sleep(0.5)
+            self.wakeups += 1
+
+
+def _busy(ms):
+    # Stand-in for Tk callback work and GIL contention
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+def bench_timer(seconds, intervals, tick_cost_ms, contention):
+    results = {}
+    stop_contention = threading.Event()
+
+    def contend():
+        while not stop_contention.is_set():
+            _busy(5)
+            time.sleep(0.001)
+
+    if contention:
+        for _ in range(contention):
+            thread = threading.Thread(target=contend)
+            thread.daemon = True
+            thread.start()
+
+    def run(name, timer):
+        done = threading.Event()
+        state = {"start": None, "expired": 0, "drift": []}
+
+        def on_tick(remaining):
+            _busy(tick_cost_ms)
+
+        def on_expire():
+            now = time.monotonic()
+            state["expired"] += 1
+            scheduled = state["start"] + seconds * state["expired"]
+            state["drift"].append(now - scheduled)
+            if state["expired"] >= intervals:
+                done.set()
+            elif isinstance(timer, DeadlineTimer):
+                timer.chain(seconds)
+            else:
+                timer.time_remaining = seconds
+
+        timer.on_tick = on_tick
+        timer.on_expire = on_expire
+        state["start"] = time.monotonic()
+        timer.start(seconds)
+        done.wait()
+        elapsed = time.monotonic() - state["start"]
+        timer.stop()
+        results[name] = {
+            "end_drift_s": round(state["drift"][-1], 4),
+            "max_drift_s": round(max(state["drift"]), 4),
+            "wakeups_per_minute": round(timer.wakeups * 60.0 / elapsed, 1),
+        }
+
+    threads = [
+        threading.Thread(target=run, args=("legacy_sleep_loop", LegacySleepTimer(None, None))),
+        threading.Thread(target=run, args=("deadline_timer", DeadlineTimer(None, None))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop_contention.set()
+    return results
+
+
+def bench_engine(days, hours, pomodoro_minutes):
+    clock = SimulatedClock()
+
+    def run(on_transition):
+        transitions = 0
+        start = time.perf_counter()
+        for _ in range(days):
+            engine = PomodoroEngine(clock)
+            engine.configure(pomodoro_minutes * 60)
+            transitions += simulate_day(engine, clock, hours, on_transition)
+        return transitions, time.perf_counter() - start
+
+    # Log the same rows log_activity would, into memory
+    sink = io.StringIO()
+    writer = csv.writer(sink)
+    epoch = datetime.datetime(2025, 1, 1)
+
+    def log_transition(transition):
+        if transition.pomodoro_completed:
+            stamp = epoch + datetime.timedelta(seconds=transition.at)
+            writer.writerow([stamp.strftime("%Y-%m-%d %H:%M:%S"), "pomodoro_completed",
+                             f"Pomodoro #{transition.pomodoro_completed}", ""])
+
+    transitions, bare = run(None)
+    _, logged = run(log_transition)
+
+    # Allocation profile of a single simulated day
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    engine = PomodoroEngine(clock)
+    engine.configure(pomodoro_minutes * 60)
+    simulate_day(engine, clock, hours)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+
+    # Whole-day forecast table and lookups into it
+    engine = PomodoroEngine(clock)
+    engine.configure(pomodoro_minutes * 60)
+    schedule = DaySchedule()
+    day_start = datetime.datetime(2025, 1, 1, 8).timestamp()
+    schedule.plan(engine, day_start + engine.time_remaining)
+    lookups = 100000
+    start = time.perf_counter()
+    for i in range(lookups):
+        schedule.current(day_start + i % 36000)
+        schedule.pomodoro_end(i % 20 + 1)
+    lookup = time.perf_counter() - start
+
+    return {
+        "days": days,
+        "transitions": transitions,
+        "days_per_second": round(days / bare, 1),
+        "ns_per_transition": round(bare / transitions * 1e9, 1),
+        "ns_per_transition_with_logging": round(logged / transitions * 1e9, 1),
+        "logging_overhead_pct": round((logged - bare) / bare * 100, 1),
+        "peak_bytes_per_day": peak,
+        "net_blocks_per_day": blocks_after - blocks_before,
+        "schedule_plan_us": schedule.stats()["last_plan_us"],
+        "schedule_entries": schedule.stats()["entries"],
+        "ns_per_forecast_lookup": round(lookup / (lookups * 2) * 1e9, 1),
+    }
+
+
+def bench_report(years, jobs_list, chunk_size):
+    log_dir = tempfile.mkdtemp(prefix="focus_bench_logs_")
+    try:
+        write_synthetic_logs(log_dir, int(years * 365))
+        cache_path = os.path.join(log_dir, "bench_cache.json")
+        runs = []
+        for jobs in jobs_list:
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            builder = ReportBuilder(log_dir, cache_path=cache_path, jobs=jobs, chunk_size=chunk_size)
+            builder.build()
+            runs.append(dict(builder.stats, cache="cold"))
+
+        # Re-run with a warm cache after one day changes
+        last_day = sorted(os.listdir(log_dir))[-2]
+        with open(os.path.join(log_dir, last_day), 'a', newline='') as f:
+            f.write("2099-01-01 00:00:00,pause,Timer paused,bench\r\n")
+        builder = ReportBuilder(log_dir, cache_path=cache_path, jobs=jobs_list[-1], chunk_size=chunk_size)
+        builder.build()
+        runs.append(dict(builder.stats, cache="warm"))
+        return {"files": len(os.listdir(log_dir)) - 1, "runs": runs}
+    finally:
+        shutil.rmtree(log_dir)
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_journal(years):
+    work_dir = tempfile.mkdtemp(prefix="focus_bench_journal_")
+    try:
+        log_dir = os.path.join(work_dir, "logs")
+        write_synthetic_logs(log_dir, int(years * 365))
+        base = os.path.join(work_dir, "journal")
+
+        start = time.perf_counter()
+        rows = csv_to_journal(log_dir, base)
+        convert = time.perf_counter() - start
+
+        # Count pomodoros per day both ways
+        start = time.perf_counter()
+        csv_counts = {}
+        for name in os.listdir(log_dir):
+            with open(os.path.join(log_dir, name), newline='') as f:
+                csv_counts[name[10:20]] = sum(1 for row in csv.reader(f) if row[1] == "pomodoro_completed")
+        csv_scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pomodoro = EVENT_IDS["pomodoro_completed"]
+        journal_counts = {}
+        with JournalReader(base) as reader:
+            for record in reader.raw_records():
+                if record[1] == pomodoro:
+                    journal_counts[record[3]] = journal_counts.get(record[3], 0) + 1
+        journal_scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with JournalReader(base) as reader:
+            for _ in reader.rows():
+                pass
+        journal_decode = time.perf_counter() - start
+
+        # Converting back must reproduce the original files byte for byte
+        out_dir = os.path.join(work_dir, "roundtrip")
+        journal_to_csv(base, out_dir)
+        lossless = all(
+            open(os.path.join(log_dir, name), 'rb').read() == open(os.path.join(out_dir, name), 'rb').read()
+            for name in os.listdir(log_dir))
+
+        csv_bytes = _directory_size(log_dir)
+        journal_bytes = os.path.getsize(base + RECORDS_SUFFIX) + os.path.getsize(base + STRINGS_SUFFIX)
+        return {
+            "days": len(os.listdir(log_dir)),
+            "rows": rows,
+            "csv_bytes": csv_bytes,
+            "journal_bytes": journal_bytes,
+            "size_ratio": round(journal_bytes / csv_bytes, 3),
+            "convert_seconds": round(convert, 3),
+            "csv_scan_seconds": round(csv_scan, 4),
+            "journal_scan_seconds": round(journal_scan, 4),
+            "journal_full_decode_seconds": round(journal_decode, 4),
+            "scan_speedup": round(csv_scan / journal_scan, 1),
+            "counts_match": sum(csv_counts.values()) == sum(journal_counts.values()),
+            "lossless_roundtrip": lossless,
+        }
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def legacy_rebuild(frame, intention, goals, completed_goals, pomodoros_completed):
+    # The original setup_expanded_view: destroy every child and rebuild
+    import tkinter as tk
+    from tkinter import ttk
+
+    for widget in frame.winfo_children():
+        widget.destroy()
+    intention_frame = ttk.Frame(frame)
+    intention_frame.pack(fill=tk.X, pady=5)
+    ttk.Label(intention_frame, text="Daily Intention:", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
+    ttk.Label(intention_frame, text=intention, font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+    goals_frame = ttk.Frame(frame)
+    goals_frame.pack(fill=tk.X, pady=5)
+    ttk.Label(goals_frame, text="Goals:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
+    for goal in goals:
+        if goal in completed_goals:
+            continue
+        goal_frame = ttk.Frame(goals_frame)
+        goal_frame.pack(fill=tk.X, pady=2)
+        var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(goal_frame, text=goal, variable=var).pack(side=tk.LEFT, padx=5)
+    if completed_goals:
+        completed_frame = ttk.Frame(frame)
+        completed_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(completed_frame, text="Completed:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
+        for goal in completed_goals:
+            ttk.Label(completed_frame, text=f"✓ {goal}", foreground="green").pack(anchor=tk.W, padx=15)
+    status_frame = ttk.Frame(frame)
+    status_frame.pack(fill=tk.X, pady=5)
+    ttk.Label(status_frame, text=f"Pomodoros completed: {pomodoros_completed}").pack(side=tk.LEFT, padx=5)
+    if all(goal in completed_goals for goal in goals) and goals:
+        ttk.Button(frame, text="Add New Goal").pack(pady=10)
+
+
+def bench_view(goals_count):
+    # Needs a display (e.g. run under xvfb-run on a headless machine)
+    import tkinter as tk
+    from tkinter import ttk
+    from focus_ui import ExpandedView
+
+    root = tk.Tk()
+    root.withdraw()
+
+    def run(update):
+        goals = []
+        completed = []
+        latencies = []
+        for i in range(goals_count):
+            goals.append(f"Goal {i}")
+            if i % 3 == 2:
+                completed.append(goals[i - 1])
+            start = time.perf_counter()
+            update(goals, completed, i)
+            root.update_idletasks()
+            latencies.append((time.perf_counter() - start) * 1000)
+        return {
+            "p50_ms": round(percentile(latencies, 0.5), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "last_ms": round(latencies[-1], 3),
+            "total_ms": round(sum(latencies), 1),
+        }
+
+    try:
+        legacy_frame = ttk.Frame(root)
+        legacy_frame.pack()
+        legacy = run(lambda goals, completed, n: legacy_rebuild(legacy_frame, "Intention", goals, completed, n))
+        legacy_frame.destroy()
+
+        view_frame = ttk.Frame(root)
+        view_frame.pack()
+        view = ExpandedView(view_frame, lambda goal, var: None, lambda: None)
+        session = SessionModel()
+        session.daily_intention = "Intention"
+
+        def render(goals, completed, n):
+            session.add_goal(goals[-1])
+            if completed and not session.is_completed(completed[-1]):
+                session.complete_goal(completed[-1])
+            view.render(session, n)
+
+        retained = run(render)
+        retained["widgets"] = view.stats()
+    finally:
+        root.destroy()
+    return {"goals": goals_count, "rebuild": legacy, "retained": retained}
+
+
+def _write_tone(path, minutes, rate=44100):
+    # A stereo 16-bit test track, written a second at a time
+    second = bytes(rate * 4)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        for _ in range(int(minutes * 60)):
+            f.writeframes(second)
+
+
+def _rss_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def ambient_worker(mode, path):
+    # Runs in a fresh process so each mode's peak RSS is its own
+    import focus_audio
+
+    focus_audio.get_mixer()
+    baseline = _rss_kb("VmRSS")
+    start = time.perf_counter()
+    if mode == "decoded":
+        sound = focus_audio.get_mixer().Sound(path)
+        sound.play(loops=-1)
+    else:
+        ambient = focus_audio.AmbientLoop(path)
+        ambient.play()
+    started = time.perf_counter() - start
+    time.sleep(2)
+    print(json.dumps({"baseline_kb": baseline, "peak_kb": _rss_kb("VmHWM"), "start_ms": round(started * 1000, 1)}))
+
+
+def bench_ambient(minutes):
+    work_dir = tempfile.mkdtemp(prefix="focus_bench_ambient_")
+    try:
+        path = os.path.join(work_dir, "ambient.wav")
+        _write_tone(path, minutes)
+        env = dict(os.environ)
+        # Nothing needs to be heard; the dummy driver works without a sound card
+        env.setdefault("SDL_AUDIODRIVER", "dummy")
+        env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+        result = {"track_mb": round(os.path.getsize(path) / 2 ** 20, 1)}
+        for mode in ("decoded", "streamed"):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "ambient", "--worker", mode, path],
+                                    env=env, capture_output=True, text=True, check=True).stdout
+            measured = json.loads(output.strip().splitlines()[-1])
+            measured["peak_over_baseline_mb"] = round((measured["peak_kb"] - measured["baseline_kb"]) / 1024, 1)
+            result[mode] = measured
+        return result
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def bench_sound_cache(sound_folder):
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import focus_audio
+
+    mixer = focus_audio.get_mixer()
+    names = sorted(name for name in os.listdir(sound_folder) if name.endswith(".wav"))
+    cache_dir = tempfile.mkdtemp(prefix="focus_bench_sounds_")
+    try:
+        def timed(load):
+            times = {}
+            for name in names:
+                start = time.perf_counter()
+                load(os.path.join(sound_folder, name))
+                times[name] = round((time.perf_counter() - start) * 1000, 1)
+            return times
+
+        direct = timed(mixer.Sound)
+        cold_preparer = focus_audio.SoundPreparer(cache_dir)
+        cold = timed(cold_preparer.load)
+        # A new preparer, as on the next launch
+        warm_preparer = focus_audio.SoundPreparer(cache_dir)
+        warm = timed(warm_preparer.load)
+        return {
+            "mixer": mixer.get_init(),
+            "load_ms": {"direct": direct, "cold_cache": cold, "warm_cache": warm},
+            "warm_hits": warm_preparer.hits,
+            "source_bytes": sum(os.path.getsize(os.path.join(sound_folder, name)) for name in names),
+            "cache_bytes": warm_preparer.cache_size(),
+        }
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def bench_checkpoint(hours, interval_seconds, pomodoro_minutes, fsync):
+    # A simulated day checkpointed the way the app does it: every few seconds,
+    # with the interval deadline rather than the countdown in the state
+    work_dir = tempfile.mkdtemp(prefix="focus_bench_checkpoint_")
+    try:
+        checkpointer = SessionCheckpointer(os.path.join(work_dir, "session_checkpoint.json"), fsync=fsync)
+        clock = SimulatedClock()
+        engine = PomodoroEngine(clock)
+        engine.configure(pomodoro_minutes * 60)
+        goals = [f"Goal {n}" for n in range(1, 4)]
+        completed = []
+        ends_at = engine.time_remaining
+        calls = 0
+        start = time.perf_counter()
+        while clock() < hours * 3600:
+            clock.advance(interval_seconds)
+            while clock() >= ends_at:
+                engine.advance()
+                ends_at += engine.time_remaining
+                if engine.total_pomodoros_completed % 4 == 0 and len(completed) < len(goals):
+                    completed.append(goals[len(completed)])
+            checkpointer.save({
+                "daily_intention": "Deep work",
+                "goals": goals,
+                "completed_goals": completed,
+                "engine": engine.snapshot(),
+                "running": True,
+                "paused": False,
+                "interval_ends_at": ends_at,
+            })
+            calls += 1
+        elapsed = time.perf_counter() - start
+        result = checkpointer.stats()
+        result.update({
+            "calls": calls,
+            "writes_per_hour": round(checkpointer.writes / hours, 1),
+            "us_per_call": round(elapsed / calls * 1e6, 1),
+            "fsync": fsync,
+        })
+        return result
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def bench_session(goal_counts, legacy_limit):
+    def legacy_day(goals):
+        # The old lists: a membership scan per check, and an all() scan per completion
+        completed = []
+        for goal in goals:
+            if goal not in completed:
+                completed.append(goal)
+            all(g in completed for g in goals)
+        return goals, completed
+
+    def model_day(goals):
+        session = SessionModel()
+        session.start_day("Intention", goals)
+        for goal in goals:
+            session.complete_goal(goal, "Done")
+            session.all_completed()
+        return session
+
+    def measure(build, goals):
+        start = time.perf_counter()
+        build(goals)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        kept = build(goals)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return elapsed, size
+
+    results = []
+    for count in goal_counts:
+        goals = [f"Goal number {i}" for i in range(count)]
+        model_seconds, model_bytes = measure(model_day, goals)
+        result = {
+            "goals": count,
+            "model_ns_per_completion": round(model_seconds / count * 1e9, 1),
+            "model_bytes": model_bytes,
+        }
+        if count <= legacy_limit:
+            legacy_seconds, legacy_bytes = measure(legacy_day, goals)
+            result.update(legacy_ns_per_completion=round(legacy_seconds / count * 1e9, 1),
+                          legacy_bytes=legacy_bytes)
+        results.append(result)
+
+    # Ring buffer of recent events: cost per record and size once full
+    session = SessionModel()
+    records = 100000
+    start = time.perf_counter()
+    for i in range(records):
+        session.record("2025-01-01 09:00:00", "pomodoro_completed", f"Pomodoro #{i}", "")
+    record_ns = (time.perf_counter() - start) / records * 1e9
+    start = time.perf_counter()
+    for _ in range(records):
+        session.recent_events(5)
+    recent_ns = (time.perf_counter() - start) / records * 1e9
+    return {
+        "goals": results,
+        "recent_capacity": session.recent.maxlen,
+        "ns_per_event_record": round(record_ns, 1),
+        "ns_per_recent_lookup": round(recent_ns, 1),
+    }
+
+
+def daemon_worker(sessions, seconds, pomodoro_minutes):
+    # Runs in a fresh process so each session count's memory is its own
+    import asyncio
+    from focus_daemon import FocusDaemon
+
+    async def run():
+        work_dir = tempfile.mkdtemp(prefix="focus_bench_daemon_")
+        try:
+            daemon = FocusDaemon(os.path.join(work_dir, "logs"))
+            path = os.path.join(work_dir, "daemon.sock")
+            await daemon.serve(path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            baseline = _rss_kb("VmRSS")
+
+            # Pipelined over one connection, as a broker for many clients would
+            start = time.perf_counter()
+            for first in range(0, sessions, 256):
+                batch = range(first, min(first + 256, sessions))
+                for n in batch:
+                    writer.write(json.dumps({"cmd": "start", "profile": f"user{n}",
+                                             "pomodoro_minutes": pomodoro_minutes, "intention": "Deep work",
+                                             "goals": ["a", "b", "c"]}).encode() + b"\n")
+                await writer.drain()
+                for _ in batch:
+                    assert json.loads(await reader.readline())["ok"]
+            start_seconds = time.perf_counter() - start
+            loaded = _rss_kb("VmRSS")
+
+            # Steady state: every session crossing interval boundaries, with a
+            # client polling status in the background
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            status_latency = []
+            while time.perf_counter() - wall_start < seconds:
+                sent = time.perf_counter()
+                writer.write(json.dumps({"cmd": "status", "profile": f"user{len(status_latency) % sessions}"})
+                             .encode() + b"\n")
+                await writer.drain()
+                await reader.readline()
+                status_latency.append(time.perf_counter() - sent)
+                await asyncio.sleep(0.05)
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+
+            stats = daemon.stats()
+            writer.close()
+            await daemon.close()
+            return {
+                "sessions": sessions,
+                "starts_per_second": round(sessions / start_seconds),
+                "boundaries_fired": stats["boundaries_fired"],
+                "lateness_ms_p50": stats["lateness_ms_p50"],
+                "lateness_ms_p99": stats["lateness_ms_p99"],
+                "status_ms_p50": round(percentile(status_latency, 0.5) * 1000, 3),
+                "status_ms_p99": round(percentile(status_latency, 0.99) * 1000, 3),
+                "cpu_pct": round(cpu / wall * 100, 2),
+                "cpu_pct_per_1000": round(cpu / wall * 100 / sessions * 1000, 3),
+                "rss_kb": loaded,
+                "rss_kb_per_1000": round((loaded - baseline) / sessions * 1000, 1),
+            }
+        finally:
+            shutil.rmtree(work_dir)
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def bench_daemon(session_counts, seconds, pomodoro_minutes):
+    results = []
+    for sessions in session_counts:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "daemon", "--worker", str(sessions),
+             "--seconds", str(seconds), "--pomodoro-minutes", str(pomodoro_minutes)],
+            check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def _log_events(log_dir):
+    # (time, row) for every event in every focus_log_<date>.csv, oldest first
+    from focus_history import LOG_NAME_PATTERN
+    from focus_log import LOG_HEADER, TIMESTAMP_FORMAT
+
+    for name in sorted(os.listdir(log_dir)):
+        if not LOG_NAME_PATTERN.match(name):
+            continue
+        with open(os.path.join(log_dir, name), newline='', encoding="utf-8", errors="replace") as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or row == LOG_HEADER:
+                    continue
+                try:
+                    moment = datetime.datetime.strptime(row[0], TIMESTAMP_FORMAT)
+                except ValueError:
+                    continue
+                yield moment, (row + ["", ""])[:4]
+
+
+def _widget_count(widget):
+    return 1 + sum(_widget_count(child) for child in widget.winfo_children())
+
+
+def bench_replay(log_dir, days, pomodoros_per_day, pauses_per_day, speed, max_gap, sample_every):
+    # Drives recorded or synthetic days through the app's own event paths on
+    # a hidden Tk root. Needs a display (e.g. xvfb-run).
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import tkinter as tk
+    from focus_reminder import FocusReminderApp
+    from focus_log import LogWriter
+    from focus_events import EventBus
+    from focus_metrics import Metrics
+
+    work_dir = tempfile.mkdtemp(prefix="focus_bench_replay_")
+    if log_dir is None:
+        log_dir = os.path.join(work_dir, "source")
+        write_synthetic_logs(log_dir, days, pomodoros_per_day=pomodoros_per_day, pauses_per_day=pauses_per_day)
+
+    root = tk.Tk()
+    root.withdraw()
+    metrics = Metrics(os.path.join(work_dir, "metrics"))
+    log_writer = LogWriter(os.path.join(work_dir, "logs"), metrics=metrics)
+    events = EventBus()
+    app = FocusReminderApp(root, log_writer=log_writer, events=events, metrics=metrics,
+                           checkpointer=SessionCheckpointer(os.path.join(work_dir, "checkpoint.json")),
+                           interactive=False)
+    app.engine.configure(25 * 60)
+
+    def day_started(row):
+        app.session.start_day(row[2][len("Intention: "):],
+                              [goal for goal in row[3][len("Goals: "):].split(", ") if goal])
+        app.engine.reset_day()
+        app.log_activity(row[1], row[2], row[3])
+        app.setup_expanded_view()
+
+    def pomodoro_completed(row):
+        # Three work thirds and the break
+        for _ in range(4):
+            app.handle_interval_end()
+
+    def goal_completed(row):
+        app.complete_goal(row[2], row[3])
+
+    def end_of_day(row):
+        app.log_activity(row[1], row[2], row[3])
+        app.events.publish("end_of_day", rating=row[2], comments=row[3])
+        app.session.reset_day()
+        app.setup_expanded_view()
+
+    handlers = {
+        "day_started": day_started,
+        "pomodoro_completed": pomodoro_completed,
+        "goal_completed": goal_completed,
+        "end_of_day": end_of_day,
+    }
+
+    def sample():
+        return {
+            "events": replayed[0],
+            "rss_kb": _rss_kb("VmRSS"),
+            "widgets": _widget_count(root),
+            "after_callbacks": len(root.tk.splitlist(root.tk.call("after", "info"))),
+            "log_queued": log_writer.stats()["queued"],
+        }
+
+    source = _log_events(log_dir)
+    latencies = {}
+    lateness = []
+    samples = []
+    replayed = [0]
+    state = {"previous": None, "due": 0.0}
+    start = time.perf_counter()
+
+    def step():
+        try:
+            moment, row = next(source)
+        except StopIteration:
+            root.quit()
+            return
+        if state["previous"] is not None and speed > 0:
+            gap = min(max(0.0, (moment - state["previous"]).total_seconds()), max_gap)
+            state["due"] += gap / speed
+        state["previous"] = moment
+        delay = state["due"] - (time.perf_counter() - start)
+        root.after(max(0, int(delay * 1000)), handle, row)
+
+    def handle(row):
+        began = time.perf_counter()
+        lateness.append(max(0.0, began - start - state["due"]) * 1000)
+        handlers.get(row[1], lambda row: app.log_activity(row[1], row[2], row[3]))(row)
+        root.update_idletasks()
+        latencies.setdefault(row[1], []).append((time.perf_counter() - began) * 1000)
+        replayed[0] += 1
+        if replayed[0] % sample_every == 0:
+            samples.append(sample())
+        step()
+
+    try:
+        samples.append(sample())
+        root.after(0, step)
+        root.mainloop()
+        wall = time.perf_counter() - start
+        samples.append(sample())
+        log_writer.close()
+        events.close()
+        every = [ms for values in latencies.values() for ms in values]
+        first, last = samples[1] if len(samples) > 2 else samples[0], samples[-1]
+        return {
+            "events": replayed[0],
+            "speed": speed or "max",
+            "wall_seconds": round(wall, 2),
+            "events_per_second": round(replayed[0] / wall, 1) if wall > 0 else None,
+            "handle_ms": {"p50": round(percentile(every, 0.5), 3), "p99": round(percentile(every, 0.99), 3),
+                          "max": round(max(every), 3)} if every else None,
+            "handle_ms_p99_by_event": {event: round(percentile(values, 0.99), 3)
+                                       for event, values in sorted(latencies.items())},
+            "schedule_lag_ms_p99": round(percentile(lateness, 0.99), 3) if lateness else None,
+            # Growth after the first sample, so warm-up allocations don't count
+            "rss_growth_kb": last["rss_kb"] - first["rss_kb"],
+            "widget_growth": last["widgets"] - first["widgets"],
+            "after_callback_growth": last["after_callbacks"] - first["after_callbacks"],
+            "samples": samples,
+        }
+    finally:
+        root.destroy()
+        shutil.rmtree(work_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Focus Reminder benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    timer = sub.add_parser("timer", help="compare end-of-interval drift and wakeups of the timer loops")
+    timer.add_argument("--seconds", type=int, default=20, help="length of each interval")
+    timer.add_argument("--intervals", type=int, default=3)
+    timer.add_argument("--tick-cost-ms", type=float, default=20.0, help="simulated work per tick")
+    timer.add_argument("--contention", type=int, default=1, help="threads competing for the GIL")
+
+    engine = sub.add_parser("engine", help="simulate whole days through the headless interval engine")
+    engine.add_argument("--days", type=int, default=5000)
+    engine.add_argument("--hours", type=float, default=12)
+    engine.add_argument("--pomodoro-minutes", type=int, default=25)
+
+    report = sub.add_parser("report", help="parallel report throughput on a synthetic multi-year archive")
+    report.add_argument("--years", type=float, default=3)
+    report.add_argument("--jobs", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    report.add_argument("--chunk-size", type=int, default=16)
+
+    journal = sub.add_parser("journal", help="binary journal vs. CSV: size and scan time")
+    journal.add_argument("--years", type=float, default=5)
+
+    view = sub.add_parser("view", help="expanded view update latency, full rebuild vs. retained widgets")
+    view.add_argument("--goals", type=int, default=300)
+
+    ambient = sub.add_parser("ambient", help="peak RSS of the ambient loop, fully decoded vs. streamed")
+    ambient.add_argument("--minutes", type=float, default=10, help="length of the generated track")
+    ambient.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+
+    sounds = sub.add_parser("soundcache", help="cue sound load time and size, cold vs. warm converted cache")
+    sounds.add_argument("--sounds", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds"))
+
+    checkpoint = sub.add_parser("checkpoint", help="session checkpoint writes and cost over a simulated day")
+    checkpoint.add_argument("--hours", type=float, default=12)
+    checkpoint.add_argument("--interval-seconds", type=float, default=2, help="time between checkpoint calls")
+    checkpoint.add_argument("--pomodoro-minutes", type=int, default=25)
+    checkpoint.add_argument("--no-fsync", action="store_true")
+
+    daemon = sub.add_parser("daemon", help="CPU and memory per 1000 daemon sessions under load")
+    daemon.add_argument("--sessions", type=int, nargs="+", default=[1000, 5000, 20000])
+    daemon.add_argument("--seconds", type=float, default=10, help="how long to measure the steady state")
+    daemon.add_argument("--pomodoro-minutes", type=float, default=0.1,
+                        help="short Pomodoros so sessions keep crossing interval boundaries")
+    daemon.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+
+    replay = sub.add_parser("replay", help="replay logs through the app's event paths on a hidden Tk root")
+    replay.add_argument("--logs", help="directory of focus_log_<date>.csv files (default: synthetic)")
+    replay.add_argument("--days", type=int, default=30, help="synthetic days to generate")
+    replay.add_argument("--pomodoros-per-day", type=int, default=10)
+    replay.add_argument("--pauses-per-day", type=int, default=3)
+    replay.add_argument("--speed", type=float, default=1000, help="1 is real time; 0 replays as fast as possible")
+    replay.add_argument("--max-gap", type=float, default=3600,
+                        help="longest gap between two events, in log seconds (skips nights)")
+    replay.add_argument("--sample-every", type=int, default=100, help="events between memory samples")
+
+    session = sub.add_parser("session", help="goal bookkeeping cost and memory, session model vs. plain lists")
+    session.add_argument("--goals", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    session.add_argument("--legacy-limit", type=int, default=1000,
+                         help="largest goal count to run the quadratic list version for")
+
+    args = parser.parse_args(argv)
+    if args.bench == "timer":
+        result = bench_timer(args.seconds, args.intervals, args.tick_cost_ms, args.contention)
+    elif args.bench == "engine":
+        result = bench_engine(args.days, args.hours, args.pomodoro_minutes)
+    elif args.bench == "report":
+        result = bench_report(args.years, args.jobs, args.chunk_size)
+    elif args.bench == "journal":
+        result = bench_journal(args.years)
+    elif args.bench == "view":
+        result = bench_view(args.goals)
+    elif args.bench == "ambient":
+        if args.worker:
+            ambient_worker(*args.worker)
+            return
+        result = bench_ambient(args.minutes)
+    elif args.bench == "soundcache":
+        result = bench_sound_cache(args.sounds)
+    elif args.bench == "daemon":
+        if args.worker:
+            daemon_worker(args.worker, args.seconds, args.pomodoro_minutes)
+            return
+        result = bench_daemon(args.sessions, args.seconds, args.pomodoro_minutes)
+    elif args.bench == "replay":
+        result = bench_replay(args.logs, args.days, args.pomodoros_per_day, args.pauses_per_day,
+                              args.speed, args.max_gap, args.sample_every)
+    elif args.bench == "session":
+        result = bench_session(args.goals, args.legacy_limit)
+    elif args.bench == "checkpoint":
+        result = bench_checkpoint(args.hours, args.interval_seconds, args.pomodoro_minutes, not args.no_fsync)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
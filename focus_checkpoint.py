@@ -0,0 +1,71 @@
+import json
+import os
+import time
+
+from focus_files import write_atomic
+
+CHECKPOINT_VERSION = 1
+
+
+class SessionCheckpointer:
+    # Persists the live session so a crash or logout doesn't lose the day.
+    # save() is cheap to call often: it serializes the state and only touches
+    # the disk when the bytes differ from the last checkpoint, then replaces
+    # the file atomically so a half-written checkpoint is never read.
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._last = None
+
+        self.writes = 0
+        self.skipped = 0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.size = 0
+
+    def save(self, state):
+        data = json.dumps({"version": CHECKPOINT_VERSION, "state": state},
+                          sort_keys=True, separators=(",", ":")).encode("utf-8")
+        if data == self._last:
+            self.skipped += 1
+            return False
+
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomic(self.path, data, fsync=self.fsync)
+
+        self._last = data
+        self.size = len(data)
+        self.writes += 1
+        self.last_write_ms = (time.perf_counter() - start) * 1000
+        self.max_write_ms = max(self.max_write_ms, self.last_write_ms)
+        return True
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            checkpoint = json.loads(data)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            return None
+        self._last = data
+        return checkpoint["state"]
+
+    def clear(self):
+        self._last = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        return {
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "bytes": self.size,
+            "last_write_ms": round(self.last_write_ms, 3),
+            "max_write_ms": round(self.max_write_ms, 3),
+        }
@@ -0,0 +1,487 @@
+import argparse
+import asyncio
+import datetime
+import heapq
+import json
+import math
+import os
+import re
+import socket
+import struct
+import sys
+import tempfile
+from collections import deque
+
+from focus_timer import PomodoroEngine, CUE_INTERVAL
+from focus_log import TIMESTAMP_FORMAT, append_rows, log_file_path
+from focus_metrics import latency_summary
+from focus_session import SessionModel
+
+# Per-user by default; a daemon shared by several users needs a socket path
+# they can all reach and --group (see serve())
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+                              "focus_reminder.sock")
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "profiles")
+PROFILE_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}$")  # also a directory name
+LOG_FLUSH_SECONDS = 1.0
+MAX_REQUEST_BYTES = 64 * 1024
+RECENT_EVENTS = 32  # per session; thousands of sessions share the process
+
+
+class DaemonError(Exception):
+    pass
+
+
+class Session:
+    # One profile's day, driven by the daemon instead of a Tk window
+
+    __slots__ = ("profile", "engine", "model", "deadline", "paused_remaining", "generation",
+                 "transitions", "last_cue")
+
+    def __init__(self, profile, engine, daily_intention, goals):
+        self.profile = profile
+        self.engine = engine
+        self.deadline = None
+        self.paused_remaining = None
+        # Bumped whenever the deadline changes; older heap entries are stale
+        self.generation = 0
+        self.model = SessionModel(RECENT_EVENTS)
+        self.model.start_day(daily_intention, goals)
+        self.transitions = 0
+        self.last_cue = None
+
+    def remaining(self, now):
+        if self.paused_remaining is not None:
+            return self.paused_remaining
+        return max(0.0, self.deadline - now)
+
+    def status(self, now):
+        engine = self.engine
+        return {
+            "profile": self.profile,
+            "interval": f"W{engine.current_interval+1}" if engine.is_work() else "Break",
+            "time_remaining": math.ceil(self.remaining(now)),
+            "paused": self.paused_remaining is not None,
+            "pomodoros_completed": engine.total_pomodoros_completed,
+            "pomodoro_time": engine.pomodoro_time,
+            "daily_intention": self.model.daily_intention,
+            "goals": self.model.goals,
+            "completed_goals": self.model.completed_goals,
+            "recent_events": [list(record) for record in self.model.recent_events(5)],
+            # Clients poll these to know when to ring a cue
+            "transitions": self.transitions,
+            "last_cue": self.last_cue,
+        }
+
+
+class DeadlineHeap:
+    # Every running session's next interval end in one min-heap. Pausing or
+    # stopping a session doesn't search the heap; its entry is left in place
+    # and skipped when it surfaces, and the heap is rebuilt if those pile up.
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, session):
+        session.generation += 1
+        self._seq += 1
+        heapq.heappush(self._heap, (session.deadline, self._seq, session.generation, session))
+
+    def discard(self, session):
+        session.generation += 1
+        self.stale += 1
+        if self.stale > 64 and self.stale > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if entry[2] == entry[3].generation]
+            heapq.heapify(self._heap)
+            self.stale = 0
+
+    def next_deadline(self):
+        while self._heap and self._heap[0][2] != self._heap[0][3].generation:
+            heapq.heappop(self._heap)
+            self.stale = max(0, self.stale - 1)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        due = []
+        while self.next_deadline() is not None and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[3])
+        return due
+
+
+class FocusDaemon:
+    # Hosts many sessions on one asyncio loop. A single loop timer is armed
+    # for the earliest deadline in the heap, so idle sessions cost no wakeups
+    # and scheduling is O(log n) per interval boundary.
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, loop=None):
+        self.log_dir = log_dir
+        self.loop = loop or asyncio.get_running_loop()
+        self.sessions = {}
+        # profile -> uid of the user who first started it; other users can't touch it
+        self.owners = {}
+        self.shared = False
+        self.heap = DeadlineHeap()
+        self._timer = None
+        self._timer_when = None
+        self._server = None
+
+        # Log rows are buffered per file and appended off the loop once a second
+        self._pending_rows = {}
+        self._flush_task = None
+
+        self.requests = 0
+        self.fired = 0
+        self.rows_logged = 0
+        self.lateness = deque(maxlen=4096)  # seconds each boundary ran past its deadline
+
+    def now(self):
+        return self.loop.time()
+
+    # Scheduling
+
+    def _schedule(self, session):
+        self.heap.push(session)
+        self._arm()
+
+    def _arm(self):
+        when = self.heap.next_deadline()
+        if when == self._timer_when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self.loop.call_at(when, self._fire) if when is not None else None
+        self._timer_when = when
+
+    def _fire(self):
+        self._timer = None
+        self._timer_when = None
+        now = self.now()
+        for session in self.heap.pop_due(now):
+            self.lateness.append(now - session.deadline)
+            self.fired += 1
+            transition = session.engine.advance()
+            session.transitions += 1
+            session.last_cue = "interval" if transition.cue == CUE_INTERVAL else "break"
+            if transition.pomodoro_completed:
+                self._log(session, "pomodoro_completed", f"Pomodoro #{transition.pomodoro_completed}", "")
+            # From the previous deadline, so a late wakeup doesn't stretch the next interval
+            session.deadline += session.engine.time_remaining
+            self.heap.push(session)
+        self._arm()
+
+    # Commands
+
+    def handle(self, request, uid=None):
+        # uid is the caller's user id from the socket; None for in-process callers
+        self.requests += 1
+        command = request.get("cmd")
+        handler = getattr(self, f"cmd_{command}", None) if isinstance(command, str) else None
+        if handler is None:
+            raise DaemonError(f"Unknown command: {command}")
+        if command == "status" and "profile" not in request:
+            return self.stats()
+        if "profile" in request and not isinstance(request["profile"], str):
+            raise DaemonError("profile must be a string")
+        self._authorize(request.get("profile"), uid)
+        result = handler(request)
+        if command == "start" and uid is not None:
+            self.owners.setdefault(request["profile"], uid)
+        return result
+
+    def _authorize(self, profile, uid):
+        owner = self.owners.get(profile)
+        if uid is None or owner is None or uid in (owner, 0, os.getuid()):
+            return
+        raise DaemonError(f"Profile {profile} belongs to another user")
+
+    def _session(self, request):
+        session = self.sessions.get(request.get("profile"))
+        if session is None:
+            raise DaemonError(f"No session for profile: {request.get('profile')}")
+        return session
+
+    def cmd_start(self, request):
+        profile = request.get("profile")
+        if not isinstance(profile, str) or not PROFILE_PATTERN.match(profile):
+            raise DaemonError("Profile names are 1-64 letters, digits, '.', '_' or '-', not starting with '.'")
+        if profile in self.sessions:
+            raise DaemonError(f"Session already running for profile: {profile}")
+        try:
+            pomodoro_minutes = float(request.get("pomodoro_minutes", 25))
+        except (TypeError, ValueError):
+            pomodoro_minutes = 0
+        # inf/nan would overflow int() or never end an interval
+        pomodoro_seconds = int(pomodoro_minutes * 60) if math.isfinite(pomodoro_minutes) else 0
+        if pomodoro_seconds < 3:
+            raise DaemonError("pomodoro_minutes must be a positive number")
+        intention = str(request.get("intention", ""))[:28]
+        goals = request.get("goals", [])
+        if not isinstance(goals, list):
+            raise DaemonError("goals must be a list")
+        goals = [str(goal)[:28] for goal in goals][:3]
+
+        engine = PomodoroEngine(self.now)
+        engine.configure(pomodoro_seconds)
+        session = Session(profile, engine, intention, goals)
+        session.deadline = self.now() + engine.time_remaining
+        self.sessions[profile] = session
+        self._schedule(session)
+        self._log(session, "day_started", f"Intention: {intention}", f"Goals: {', '.join(goals)}")
+        return session.status(self.now())
+
+    def cmd_pause(self, request):
+        session = self._session(request)
+        if session.paused_remaining is None:
+            session.paused_remaining = session.remaining(self.now())
+            self.heap.discard(session)
+            self._arm()
+            self._log(session, "pause", "Timer paused", str(request.get("reason", "")))
+        return session.status(self.now())
+
+    def cmd_resume(self, request):
+        session = self._session(request)
+        if session.paused_remaining is not None:
+            session.deadline = self.now() + session.paused_remaining
+            session.paused_remaining = None
+            self._schedule(session)
+            self._log(session, "resume", "Timer resumed", "")
+        return session.status(self.now())
+
+    def cmd_status(self, request):
+        return self._session(request).status(self.now())
+
+    def cmd_log(self, request):
+        session = self._session(request)
+        event = str(request.get("event", ""))
+        if not event:
+            raise DaemonError("log needs an event")
+        detail = str(request.get("detail", ""))
+        remarks = str(request.get("remarks", ""))
+        if event == "goal_completed":
+            session.model.complete_goal(detail, remarks)
+        self._log(session, event, detail, remarks)
+        return session.status(self.now())
+
+    def cmd_stop(self, request):
+        session = self._session(request)
+        self.heap.discard(session)
+        self._arm()
+        del self.sessions[session.profile]
+        return {"profile": session.profile, "stopped": True}
+
+    # Logging
+
+    def _log(self, session, event, detail, remarks):
+        timestamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+        session.model.record(timestamp, event, detail, remarks)
+        path = log_file_path(os.path.join(self.log_dir, session.profile), timestamp[:10])
+        self._pending_rows.setdefault(path, []).append([timestamp, event, detail, remarks])
+        if self._flush_task is None:
+            self._flush_task = self.loop.create_task(self._flush_logs())
+
+    async def _flush_logs(self):
+        await asyncio.sleep(LOG_FLUSH_SECONDS)
+        self._flush_task = None
+        await self.flush_logs()
+
+    async def flush_logs(self):
+        pending, self._pending_rows = self._pending_rows, {}
+        if pending:
+            await self.loop.run_in_executor(None, self._write_rows, pending)
+
+    def _write_rows(self, pending):
+        for path, rows in pending.items():
+            try:
+                append_rows(path, rows)
+                self.rows_logged += len(rows)
+            except OSError as e:
+                print(f"Error logging activity: {e}", file=sys.stderr)
+
+    # Socket API: one JSON object per line each way
+
+    async def serve(self, path=DEFAULT_SOCKET, group=None):
+        # Owner-only unless a group is given: then its members can connect too,
+        # and each request is tied to the caller's uid via SO_PEERCRED
+        if os.path.exists(path):
+            if _listening(path):
+                raise DaemonError(f"A daemon is already listening on {path}")
+            os.remove(path)  # Left behind by one that exited without cleaning up
+        self._server = await asyncio.start_unix_server(self._client, path, limit=MAX_REQUEST_BYTES)
+        if group is None:
+            os.chmod(path, 0o600)
+        else:
+            os.chown(path, -1, _group_id(group))
+            os.chmod(path, 0o660)
+            self.shared = True
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush_logs()
+
+    async def _client(self, reader, writer):
+        uid = _peer_uid(writer.get_extra_info("socket"))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    break  # Request longer than the limit
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise DaemonError("Requests are JSON objects")
+                    if uid is None and self.shared:
+                        raise DaemonError("Can't tell which user is calling on this platform")
+                    response = {"ok": True, "result": self.handle(request, uid if uid is not None
+                                                                  else os.getuid())}
+                except (ValueError, DaemonError) as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self):
+        lateness = latency_summary(self.lateness)
+        return {
+            "sessions": len(self.sessions),
+            "running": sum(1 for s in self.sessions.values() if s.paused_remaining is None),
+            "heap_entries": len(self.heap),
+            "requests": self.requests,
+            "boundaries_fired": self.fired,
+            "rows_logged": self.rows_logged,
+            "lateness_ms_p50": lateness["p50"],
+            "lateness_ms_p99": lateness["p99"],
+        }
+
+
+def _peer_uid(sock):
+    # The connecting process's uid (Linux); None where the platform can't say
+    if sock is None or not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def _group_id(group):
+    import grp
+    try:
+        return grp.getgrnam(group).gr_gid
+    except KeyError:
+        if group.isdigit():
+            return int(group)
+        raise DaemonError(f"Unknown group: {group}")
+
+
+def _listening(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def request(message, path=DEFAULT_SOCKET, timeout=5.0):
+    # Blocking one-shot client for scripts and the command line
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+async def run_daemon(socket_path, log_dir, group=None):
+    daemon = FocusDaemon(log_dir, asyncio.get_running_loop())
+    await daemon.serve(socket_path, group)
+    print(f"Focus daemon listening on {socket_path}", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await daemon.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Focus Reminder daemon: many timer sessions, one process")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the daemon")
+    serve.add_argument("--log-dir", default=DEFAULT_LOG_DIR, help="one sub-directory of logs per profile")
+    serve.add_argument("--group", help="let this group's members use the socket too (multi-user); "
+                                       "profiles are tied to the user who started them")
+
+    start = sub.add_parser("start", help="start a profile's day")
+    start.add_argument("profile")
+    start.add_argument("--minutes", type=float, default=25, help="Pomodoro length")
+    start.add_argument("--intention", default="")
+    start.add_argument("--goal", action="append", default=[], dest="goals")
+
+    pause = sub.add_parser("pause", help="pause a profile's timer")
+    pause.add_argument("profile")
+    pause.add_argument("--reason", default="")
+
+    for name, help_text in (("resume", "resume a profile's timer"), ("stop", "end a profile's session")):
+        sub.add_parser(name, help=help_text).add_argument("profile")
+
+    status = sub.add_parser("status", help="one profile's timer, or daemon stats without a profile")
+    status.add_argument("profile", nargs="?")
+
+    log = sub.add_parser("log", help="log an event for a profile")
+    log.add_argument("profile")
+    log.add_argument("event")
+    log.add_argument("detail", nargs="?", default="")
+    log.add_argument("remarks", nargs="?", default="")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            asyncio.run(run_daemon(args.socket, args.log_dir, args.group))
+        except KeyboardInterrupt:
+            pass
+        except DaemonError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        return
+
+    message = {"cmd": args.command}
+    if getattr(args, "profile", None):
+        message["profile"] = args.profile
+    if args.command == "start":
+        message.update(pomodoro_minutes=args.minutes, intention=args.intention, goals=args.goals)
+    elif args.command == "pause":
+        message["reason"] = args.reason
+    elif args.command == "log":
+        message.update(event=args.event, detail=args.detail, remarks=args.remarks)
+    response = request(message, args.socket)
+    if not response["ok"]:
+        print(response["error"], file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(response["result"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import abc
+import datetime
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from focus_log import TIMESTAMP_FORMAT
+from focus_metrics import latency_summary
+
+EVENTS = ("pomodoro_completed", "interval_started", "pause", "resume", "goal_completed", "end_of_day")
+DEFAULT_TIMEOUT = 5.0
+
+
+class Hook(abc.ABC):
+    # Something to run for published events. With batch=True run() gets every
+    # event that queued up while the hook was busy, otherwise one at a time.
+
+    def __init__(self, name, events=None, timeout=DEFAULT_TIMEOUT, batch=False):
+        unknown = set(events or ()) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Unknown events for hook {name}: {', '.join(sorted(unknown))}")
+        self.name = name
+        self.events = frozenset(events) if events else None  # None means all
+        self.timeout = timeout
+        self.batch = batch
+
+    def wants(self, event):
+        return self.events is None or event in self.events
+
+    @abc.abstractmethod
+    def run(self, records):
+        pass
+
+
+class CallableHook(Hook):
+    def __init__(self, func, events=None, timeout=DEFAULT_TIMEOUT, batch=False, name=None):
+        super().__init__(name or getattr(func, "__name__", repr(func)), events, timeout, batch)
+        self.func = func
+
+    def run(self, records):
+        # A Python call can't be interrupted; an overrun is counted as a timeout
+        if self.batch:
+            self.func(records)
+        else:
+            self.func(records[0])
+
+
+class CommandHook(Hook):
+    # Runs an external command with the events as JSON lines on stdin and the
+    # (last) event name in $FOCUS_EVENT. Killed if it outlives its timeout.
+
+    def __init__(self, command, events=None, timeout=DEFAULT_TIMEOUT, batch=False, name=None):
+        argv = shlex.split(command) if isinstance(command, str) else list(command)
+        super().__init__(name or argv[0], events, timeout, batch)
+        self.argv = argv
+
+    def run(self, records):
+        env = dict(os.environ, FOCUS_EVENT=records[-1]["event"])
+        subprocess.run(self.argv, input="".join(json.dumps(r) + "\n" for r in records), text=True,
+                       env=env, timeout=self.timeout, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class _HookState:
+    def __init__(self, hook):
+        self.hook = hook
+        self.pending = deque()  # (published at, record)
+        self.running = False
+
+        self.runs = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.run_latency = deque(maxlen=512)       # seconds per run
+        self.delivery_latency = deque(maxlen=512)  # seconds from publish to done
+
+
+class EventBus:
+    # Publishes app events to hooks without ever waiting on them. publish()
+    # only appends to each subscribed hook's bounded queue; a small thread
+    # pool drains the queues. A hook has at most one run in flight, so its
+    # events stay in order and whatever arrives meanwhile forms the next
+    # batch. When a hook falls max_queue events behind, its oldest are dropped.
+
+    def __init__(self, workers=2, max_queue=256, max_batch=32):
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="focus-hook")
+        self._lock = threading.Condition()
+        self._hooks = []
+        self._closed = False
+        self.published = 0
+
+    def register(self, hook):
+        with self._lock:
+            # Names key the stats, so keep them unique
+            names = {state.hook.name for state in self._hooks}
+            base, n = hook.name, 1
+            while hook.name in names:
+                n += 1
+                hook.name = f"{base}#{n}"
+            self._hooks.append(_HookState(hook))
+        return hook
+
+    def subscribe(self, func, events=None, timeout=DEFAULT_TIMEOUT, batch=False):
+        return self.register(CallableHook(func, events, timeout, batch))
+
+    def publish(self, event, **data):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event: {event}")
+        record = {"event": event, "time": datetime.datetime.now().strftime(TIMESTAMP_FORMAT)}
+        record.update(data)
+        posted = time.perf_counter()
+
+        ready = []
+        with self._lock:
+            if self._closed:
+                return
+            self.published += 1
+            for state in self._hooks:
+                if not state.hook.wants(event):
+                    continue
+                if len(state.pending) >= self.max_queue:
+                    state.pending.popleft()
+                    state.dropped += 1
+                state.pending.append((posted, record))
+                if not state.running:
+                    state.running = True
+                    ready.append(state)
+        for state in ready:
+            self._pool.submit(self._run, state)
+
+    def _run(self, state):
+        hook = state.hook
+        with self._lock:
+            size = self.max_batch if hook.batch else 1
+            batch = [state.pending.popleft() for _ in range(min(size, len(state.pending)))]
+
+        start = time.perf_counter()
+        try:
+            hook.run([record for _, record in batch])
+        except subprocess.TimeoutExpired:
+            state.timeouts += 1
+        except Exception as e:
+            state.errors += 1
+            print(f"Error in hook {hook.name}: {e}")
+        else:
+            if time.perf_counter() - start > hook.timeout:
+                state.timeouts += 1
+        done = time.perf_counter()
+
+        with self._lock:
+            state.runs += 1
+            state.delivered += len(batch)
+            state.run_latency.append(done - start)
+            for posted, _ in batch:
+                state.delivery_latency.append(done - posted)
+            more = bool(state.pending)
+            if not more:
+                state.running = False
+                self._lock.notify_all()
+        if more:
+            # Back of the line, so one busy hook can't starve the others
+            try:
+                self._pool.submit(self._run, state)
+            except RuntimeError:
+                # Shut down after close() gave up waiting
+                with self._lock:
+                    state.running = False
+
+    def close(self, timeout=5.0):
+        # Give queued events a chance to run, then stop accepting new ones
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._closed = True
+            while any(state.running for state in self._hooks):
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._lock.wait(left)
+            drained = not any(state.running for state in self._hooks)
+        self._pool.shutdown(wait=False)
+        return drained
+
+    def stats(self):
+        with self._lock:
+            return {
+                "published": self.published,
+                "hooks": {state.hook.name: {
+                    "queued": len(state.pending),
+                    "runs": state.runs,
+                    "delivered": state.delivered,
+                    "dropped": state.dropped,
+                    "errors": state.errors,
+                    "timeouts": state.timeouts,
+                    "run_ms": latency_summary(state.run_latency),
+                    "delivery_ms": latency_summary(state.delivery_latency),
+                } for state in self._hooks},
+            }
+
+
+def load_hooks(bus, path):
+    # hooks.json: [{"command": "...", "events": [...], "timeout": 5, "batch": false}, ...]
+    # A broken file or entry is reported and skipped; it never stops the app
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"Error reading hooks from {path}: {e}")
+        return 0
+    if not isinstance(entries, list):
+        print(f"Error reading hooks from {path}: expected a list of hooks")
+        return 0
+    loaded = 0
+    for i, entry in enumerate(entries):
+        try:
+            bus.register(CommandHook(entry["command"], entry.get("events"),
+                                     float(entry.get("timeout", DEFAULT_TIMEOUT)),
+                                     bool(entry.get("batch", False)), entry.get("name")))
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+            print(f"Skipping hook #{i + 1} in {path}: {e!r}")
+            continue
+        loaded += 1
+    return loaded
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+# mkstemp creates files owner-only; replaced files get the usual umask-based
+# mode instead, so e.g. node_exporter can still read the metrics textfile
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_atomic(path, data, fsync=False):
+    # Readers see either the old file or the new one, never a partial write.
+    # The temp file is unique and sits next to the target, so concurrent
+    # writers don't clobber each other and os.replace stays on one filesystem.
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,251 @@
+import csv
+import datetime
+import json
+import os
+import re
+import time
+from collections import Counter
+
+from focus_files import write_atomic
+from focus_log import LOG_HEADER
+
+INDEX_NAME = ".history_index.json"
+INDEX_VERSION = 1
+LOG_NAME_PATTERN = re.compile(r"^focus_log_(\d{4}-\d{2}-\d{2})\.csv$")
+RATING_PATTERN = re.compile(r"^Rating:\s*(\d+)")
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+EVENT_TYPES = ("day_started", "pomodoro_completed", "pause", "resume", "goal_completed", "end_of_day")
+
+
+def parse_rating(detail):
+    match = RATING_PATTERN.match(detail)
+    return int(match.group(1)) if match else None
+
+
+def iter_records(path, start=0):
+    # Yields (start offset, end offset, row) for every complete CSV record from
+    # start on. A trailing record that is still being written is left for next time.
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = [start]
+        exhausted = [False]
+
+        def lines():
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    exhausted[0] = True
+                    return
+                position[0] += len(line)
+                yield line.decode("utf-8", errors="replace")
+
+        record_start = start
+        reader = csv.reader(lines())
+        try:
+            for row in reader:
+                if exhausted[0]:
+                    # The reader hands back a quoted field cut off at EOF as a
+                    # row; a complete record is yielded before the next line is read
+                    return
+                yield record_start, position[0], row
+                record_start = position[0]
+        except csv.Error:
+            return
+
+
+class HistoryIndex:
+    # Per-day aggregates and row offsets for every focus_log_<date>.csv,
+    # persisted next to the logs. refresh() only reads bytes appended since the
+    # last run, so queries over a year of logs don't reopen every file.
+
+    def __init__(self, log_dir, index_path=None):
+        self.log_dir = log_dir
+        self.index_path = index_path or os.path.join(log_dir, INDEX_NAME)
+        self.files = {}  # file name -> {"size", "mtime", "offset"}
+        self.days = {}   # date -> day aggregates
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self.files = data["files"]
+        self.days = data["days"]
+
+    def save(self):
+        write_atomic(self.index_path, json.dumps({"version": INDEX_VERSION, "files": self.files, "days": self.days},
+                                                 separators=(",", ":")))
+
+    def refresh(self):
+        try:
+            names = os.listdir(self.log_dir)
+        except FileNotFoundError:
+            names = []
+
+        seen = set()
+        appended = 0
+        changed = False
+        for name in names:
+            match = LOG_NAME_PATTERN.match(name)
+            if not match:
+                continue
+            seen.add(name)
+            date = match.group(1)
+            stat = os.stat(os.path.join(self.log_dir, name))
+            entry = self.files.get(name)
+
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            if entry is None or stat.st_size < entry["offset"] or stat.st_size == entry["size"]:
+                # New, or rewritten rather than appended to: start over
+                entry = {"size": 0, "mtime": 0, "offset": 0}
+                self.days[date] = _empty_day()
+            appended += self._scan(name, date, entry)
+            entry["size"] = stat.st_size
+            entry["mtime"] = stat.st_mtime
+            self.files[name] = entry
+            changed = True
+
+        for name in list(self.files):
+            if name not in seen:
+                del self.files[name]
+                self.days.pop(LOG_NAME_PATTERN.match(name).group(1), None)
+                changed = True
+
+        if changed:
+            self.save()
+        return appended
+
+    def _scan(self, name, date, entry):
+        day = self.days.setdefault(date, _empty_day())
+        rows = 0
+        for offset, end, row in iter_records(os.path.join(self.log_dir, name), entry["offset"]):
+            entry["offset"] = end
+            if len(row) < 2 or row == LOG_HEADER:
+                continue
+            rows += 1
+            event = row[1]
+            detail = row[2] if len(row) > 2 else ""
+            remarks = row[3] if len(row) > 3 else ""
+
+            day["counts"][event] = day["counts"].get(event, 0) + 1
+            day["offsets"].setdefault(event, []).append(offset)
+            if event == "pause" and remarks.strip():
+                reason = remarks.strip().lower()
+                day["pause_reasons"][reason] = day["pause_reasons"].get(reason, 0) + 1
+            elif event == "end_of_day":
+                rating = parse_rating(detail)
+                if rating is not None:
+                    day["ratings"].append(rating)
+        return rows
+
+    # Queries
+
+    def pomodoros_per_day(self, days=90, today=None):
+        today = today or datetime.date.today()
+        result = []
+        for i in range(days - 1, -1, -1):
+            date = (today - datetime.timedelta(days=i)).isoformat()
+            day = self.days.get(date)
+            result.append((date, day["counts"].get("pomodoro_completed", 0) if day else 0))
+        return result
+
+    def top_pause_reasons(self, n=10, days=None, today=None):
+        reasons = Counter()
+        for date in self._dates_within(days, today):
+            reasons.update(self.days[date]["pause_reasons"])
+        return reasons.most_common(n)
+
+    def average_rating_by_weekday(self, days=None, today=None):
+        totals = [[0, 0] for _ in WEEKDAYS]
+        for date in self._dates_within(days, today):
+            ratings = self.days[date]["ratings"]
+            if ratings:
+                weekday = datetime.date.fromisoformat(date).weekday()
+                totals[weekday][0] += sum(ratings)
+                totals[weekday][1] += len(ratings)
+        return [(WEEKDAYS[i], round(total / count, 2) if count else None)
+                for i, (total, count) in enumerate(totals)]
+
+    def event_counts(self, days=None, today=None):
+        counts = Counter()
+        for date in self._dates_within(days, today):
+            counts.update(self.days[date]["counts"])
+        return dict(counts)
+
+    def events(self, date, event_type):
+        # Read just the indexed rows of one type from one day's file
+        day = self.days.get(date)
+        if not day:
+            return []
+        path = os.path.join(self.log_dir, f"focus_log_{date}.csv")
+        rows = []
+        for offset in day["offsets"].get(event_type, []):
+            for _, _, row in iter_records(path, offset):
+                rows.append(row)
+                break
+        return rows
+
+    def _dates_within(self, days, today):
+        if days is None:
+            return list(self.days)
+        today = today or datetime.date.today()
+        first = (today - datetime.timedelta(days=days - 1)).isoformat()
+        return [date for date in self.days if date >= first]
+
+
+def _empty_day():
+    return {"counts": {}, "offsets": {}, "pause_reasons": {}, "ratings": []}
+
+
+def add_history_arguments(parser):
+    sub = parser.add_subparsers(dest="query", required=True)
+
+    pomodoros = sub.add_parser("pomodoros", help="Pomodoros completed per day")
+    pomodoros.add_argument("--days", type=int, default=90)
+
+    pauses = sub.add_parser("pauses", help="most common pause reasons")
+    pauses.add_argument("--top", type=int, default=10)
+    pauses.add_argument("--days", type=int)
+
+    ratings = sub.add_parser("ratings", help="average end-of-day rating by weekday")
+    ratings.add_argument("--days", type=int)
+
+    counts = sub.add_parser("counts", help="number of events of each type")
+    counts.add_argument("--days", type=int)
+
+    events = sub.add_parser("events", help="all events of one type on one day")
+    events.add_argument("date", help="YYYY-MM-DD")
+    events.add_argument("event", choices=EVENT_TYPES)
+
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+
+
+def run_history_command(args, log_dir):
+    start = time.perf_counter()
+    index = HistoryIndex(log_dir)
+    index.refresh()
+
+    if args.query == "pomodoros":
+        result = index.pomodoros_per_day(args.days)
+    elif args.query == "pauses":
+        result = index.top_pause_reasons(args.top, args.days)
+    elif args.query == "ratings":
+        result = index.average_rating_by_weekday(args.days)
+    elif args.query == "counts":
+        result = sorted(index.event_counts(args.days).items())
+    else:
+        result = index.events(args.date, args.event)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for item in result:
+        print("\t".join("" if value is None else str(value).replace("\n", " ") for value in item))
+    print(f"({elapsed_ms:.1f} ms)")
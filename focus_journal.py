@@ -0,0 +1,295 @@
+import csv
+import datetime
+import mmap
+import os
+import struct
+import sys
+
+from focus_log import LOG_HEADER, TIMESTAMP_FORMAT
+from focus_history import LOG_NAME_PATTERN
+
+# A journal is two append-only files: fixed-width records (<base>.fjr) and the
+# strings they point into (<base>.fjs). Timestamps are the log's naive local
+# times counted as seconds from 1970-01-01, so converting back is exact.
+RECORDS_SUFFIX = ".fjr"
+STRINGS_SUFFIX = ".fjs"
+RECORDS_MAGIC = b"FJRNL\x00\x01\x00"
+STRINGS_MAGIC = b"FJSTR\x00\x01\x00"
+
+# epoch seconds, event id, flags, day of the source log, detail, remarks, extra
+RECORD = struct.Struct("<qBBHIII")
+STRING_LENGTH = struct.Struct("<I")
+NO_STRING = 0xFFFFFFFF
+
+EVENT_OTHER = 0  # event name is stored in the extra string
+EVENT_IDS = {
+    "day_started": 1,
+    "pomodoro_completed": 2,
+    "pause": 3,
+    "resume": 4,
+    "goal_completed": 5,
+    "end_of_day": 6,
+}
+EVENT_NAMES = {event_id: name for name, event_id in EVENT_IDS.items()}
+
+FLAG_RAW_TIMESTAMP = 1  # timestamp didn't parse, epoch field is a string offset
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_DATE = EPOCH.date()
+
+
+def encode_timestamp(value):
+    try:
+        moment = datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+    if moment.strftime(TIMESTAMP_FORMAT) != value:
+        return None
+    return (moment - EPOCH) // datetime.timedelta(seconds=1)
+
+
+def decode_timestamp(seconds):
+    return (EPOCH + datetime.timedelta(seconds=seconds)).strftime(TIMESTAMP_FORMAT)
+
+
+def day_number(date):
+    return (datetime.date.fromisoformat(date) - EPOCH_DATE).days
+
+
+def day_string(number):
+    return (EPOCH_DATE + datetime.timedelta(days=number)).isoformat()
+
+
+class JournalWriter:
+    def __init__(self, base_path):
+        self.records_path = base_path + RECORDS_SUFFIX
+        self.strings_path = base_path + STRINGS_SUFFIX
+        self._strings = {}  # already stored text -> offset
+
+        self._strings_file = self._open(self.strings_path, STRINGS_MAGIC)
+        self._strings_end = len(STRINGS_MAGIC)
+        if self._strings_file.tell() > len(STRINGS_MAGIC):
+            for offset, text in JournalReader.read_strings(self.strings_path):
+                self._strings[text] = offset
+                self._strings_end = offset + STRING_LENGTH.size + len(text.encode("utf-8"))
+        # Drop a string torn by a crash, so the next one starts where records expect it
+        self._truncate(self._strings_file, self._strings_end)
+
+        self._records = self._open(self.records_path, RECORDS_MAGIC)
+        body = self._records.tell() - len(RECORDS_MAGIC)
+        self._truncate(self._records, len(RECORDS_MAGIC) + body // RECORD.size * RECORD.size)
+
+    @staticmethod
+    def _open(path, magic):
+        f = open(path, 'ab')
+        if f.tell() < len(magic):
+            # New, or torn before the header was complete
+            f.truncate(0)
+            f.write(magic)
+            f.flush()
+        return f
+
+    @staticmethod
+    def _truncate(f, size):
+        if f.tell() > size:
+            f.truncate(size)
+            f.seek(size)
+
+    def append_row(self, row, date=None):
+        # row is a log row: [timestamp, event, detail, remarks]
+        timestamp, event, detail, remarks = (list(row) + ["", "", "", ""])[:4]
+        flags = 0
+        epoch = encode_timestamp(timestamp)
+        if date is None and epoch is not None:
+            date = timestamp[:10]
+        day = day_number(date) if date else 0
+        if epoch is None:
+            flags |= FLAG_RAW_TIMESTAMP
+            epoch = self._string(timestamp)
+
+        event_id = EVENT_IDS.get(event, EVENT_OTHER)
+        extra = self._string(event) if event_id == EVENT_OTHER else NO_STRING
+
+        self._records.write(RECORD.pack(epoch, event_id, flags, day,
+                                        self._string(detail), self._string(remarks), extra))
+
+    def _string(self, text):
+        offset = self._strings.get(text)
+        if offset is None:
+            data = text.encode("utf-8")
+            offset = self._strings_end
+            self._strings_file.write(STRING_LENGTH.pack(len(data)))
+            self._strings_file.write(data)
+            self._strings_end += STRING_LENGTH.size + len(data)
+            self._strings[text] = offset
+        return offset
+
+    def flush(self):
+        # Strings first, so a record never points past the end of the table
+        self._strings_file.flush()
+        self._records.flush()
+
+    def close(self):
+        self.flush()
+        self._strings_file.close()
+        self._records.close()
+
+
+class JournalReader:
+    # Memory-maps both files; records are unpacked straight out of the map
+
+    def __init__(self, base_path):
+        self._files = []
+        self.records = self._map(base_path + RECORDS_SUFFIX, RECORDS_MAGIC)
+        self.strings = self._map(base_path + STRINGS_SUFFIX, STRINGS_MAGIC)
+        body = len(self.records) - len(RECORDS_MAGIC)
+        self.count = body // RECORD.size  # ignore a torn trailing record
+
+    def _map(self, path, magic):
+        f = open(path, 'rb')
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size <= len(magic):
+            return memoryview(magic)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(mapped)
+        if mapped[:len(magic)] != magic:
+            raise ValueError(f"Not a focus journal: {path}")
+        return memoryview(mapped)
+
+    def close(self):
+        self.records.release()
+        self.strings.release()
+        for f in reversed(self._files):
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raw_records(self):
+        # Tuples of (epoch, event id, flags, day, detail, remarks, extra)
+        start = len(RECORDS_MAGIC)
+        return RECORD.iter_unpack(self.records[start:start + self.count * RECORD.size])
+
+    def string(self, offset):
+        (length,) = STRING_LENGTH.unpack_from(self.strings, offset)
+        start = offset + STRING_LENGTH.size
+        return str(self.strings[start:start + length], "utf-8")
+
+    def rows(self):
+        # Yields (source day, log row) with every string decoded
+        strings = {}
+
+        def text(offset):
+            value = strings.get(offset)
+            if value is None:
+                value = strings[offset] = self.string(offset)
+            return value
+
+        for epoch, event_id, flags, day, detail, remarks, extra in self.raw_records():
+            timestamp = text(epoch) if flags & FLAG_RAW_TIMESTAMP else decode_timestamp(epoch)
+            event = text(extra) if event_id == EVENT_OTHER else EVENT_NAMES[event_id]
+            yield day_string(day), [timestamp, event, text(detail), text(remarks)]
+
+    @staticmethod
+    def read_strings(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        offset = len(STRINGS_MAGIC)
+        while offset + STRING_LENGTH.size <= len(data):
+            (length,) = STRING_LENGTH.unpack_from(data, offset)
+            end = offset + STRING_LENGTH.size + length
+            if end > len(data):
+                break
+            yield offset, data[offset + STRING_LENGTH.size:end].decode("utf-8")
+            offset = end
+
+
+def csv_to_journal(log_dir, base_path):
+    # Rebuild the journal from every focus_log_<date>.csv, oldest first, and
+    # swap it in; running it again gives the same journal rather than
+    # duplicates. Returns the row count.
+    tmp_base = f"{base_path}.{os.getpid()}.tmp"
+    for suffix in (RECORDS_SUFFIX, STRINGS_SUFFIX):
+        if os.path.exists(tmp_base + suffix):
+            os.remove(tmp_base + suffix)
+    writer = JournalWriter(tmp_base)
+    rows = 0
+    try:
+        for name in sorted(os.listdir(log_dir)):
+            match = LOG_NAME_PATTERN.match(name)
+            if not match:
+                continue
+            with open(os.path.join(log_dir, name), newline='', encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    if row == LOG_HEADER:
+                        continue
+                    writer.append_row(row, match.group(1))
+                    rows += 1
+    finally:
+        writer.close()
+    # Strings first: old records never point into a shorter string table
+    os.replace(tmp_base + STRINGS_SUFFIX, base_path + STRINGS_SUFFIX)
+    os.replace(tmp_base + RECORDS_SUFFIX, base_path + RECORDS_SUFFIX)
+    return rows
+
+
+def journal_to_csv(base_path, out_dir, force=False):
+    # Write one focus_log_<date>.csv per source day, in the app's exact format.
+    # Existing logs are only overwritten with force, never appended to.
+    os.makedirs(out_dir, exist_ok=True)
+    written = set()
+    current_day = None
+    f = None
+    writer = None
+    with JournalReader(base_path) as reader:
+        if not force:
+            days = {record[3] for record in reader.raw_records()}
+            existing = sorted(name for name in (f"focus_log_{day_string(day)}.csv" for day in days)
+                              if os.path.exists(os.path.join(out_dir, name)))
+            if existing:
+                raise FileExistsError(f"{len(existing)} logs already exist in {out_dir}, "
+                                      f"e.g. {existing[0]}; pass --force to overwrite them")
+        try:
+            for day, row in reader.rows():
+                if day != current_day:
+                    if f is not None:
+                        f.close()
+                    path = os.path.join(out_dir, f"focus_log_{day}.csv")
+                    is_new = day not in written
+                    f = open(path, 'w' if is_new else 'a', newline='', encoding="utf-8")
+                    writer = csv.writer(f)
+                    if is_new:
+                        writer.writerow(LOG_HEADER)
+                        written.add(day)
+                    current_day = day
+                writer.writerow(row)
+        finally:
+            if f is not None:
+                f.close()
+    return len(written)
+
+
+def add_journal_arguments(parser, default_base):
+    sub = parser.add_subparsers(dest="action", required=True)
+    to_journal = sub.add_parser("import", help="convert the CSV logs into a journal")
+    to_journal.add_argument("--journal", default=default_base, help="journal path without suffix")
+    to_csv = sub.add_parser("export", help="convert a journal back into daily CSV logs")
+    to_csv.add_argument("out_dir")
+    to_csv.add_argument("--journal", default=default_base, help="journal path without suffix")
+    to_csv.add_argument("--force", action="store_true", help="overwrite daily logs that already exist")
+
+
+def run_journal_command(args, log_dir):
+    if args.action == "import":
+        rows = csv_to_journal(log_dir, args.journal)
+        print(f"{rows} rows written to {args.journal}{RECORDS_SUFFIX}")
+    else:
+        try:
+            days = journal_to_csv(args.journal, args.out_dir, args.force)
+        except FileExistsError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print(f"{days} daily logs written to {args.out_dir}")
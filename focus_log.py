@@ -0,0 +1,248 @@
+import csv
+import os
+import queue
+import threading
+import time
+
+LOG_HEADER = ["Timestamp", "Event", "Detail", "Remarks"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# When buffered rows reach the disk
+FLUSH_EVERY_EVENT = "event"
+FLUSH_INTERVAL = "interval"
+FLUSH_ON_SHUTDOWN = "shutdown"
+FLUSH_POLICIES = (FLUSH_EVERY_EVENT, FLUSH_INTERVAL, FLUSH_ON_SHUTDOWN)
+
+_OPEN_DAY = "open_day"
+_ROW = "row"
+_FLUSH = "flush"
+_CLOSE = "close"
+
+
+def log_file_path(log_dir, date):
+    return os.path.join(log_dir, f"focus_log_{date}.csv")
+
+
+def append_rows(path, rows):
+    # One-shot append in the same format LogWriter produces, header included
+    # when the file is new
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(LOG_HEADER)
+        writer.writerows(rows)
+
+
+class LogWriter:
+    # Writes focus_log_<date>.csv rows from a background thread. Rows are
+    # formatted by the caller and queued; the thread keeps the day's file open
+    # and writes whatever has queued up as one batch, flushing according to
+    # the policy. The output is identical to writing each row with csv.writer.
+
+    def __init__(self, log_dir, flush_policy=FLUSH_INTERVAL, flush_interval_ms=1000,
+                 fsync=False, max_queue=1024, max_batch=256, journal=None, metrics=None):
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy: {flush_policy}")
+        self.log_dir = log_dir
+        self.flush_policy = flush_policy
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.fsync = fsync
+        self.max_batch = max_batch
+        # Optional JournalWriter that gets a copy of every row
+        self.journal = journal
+        # Optional focus_metrics.Metrics; timed here on the writer thread, where
+        # the disk time is actually spent
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.histogram("log_write", "Time the log writer thread takes to write a batch of rows")
+            metrics.histogram("log_flush", "Time the log writer thread takes to flush (and fsync) the log file")
+
+        # Bounded, so a stalled disk pushes back on the caller instead of
+        # growing without limit
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._writer = None
+        self._date = None
+        self._dirty = False
+        self._next_flush = None
+        self._closed = False
+
+        self.rows_written = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.flushes = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="focus-log-writer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def path_for(self, date):
+        return log_file_path(self.log_dir, date)
+
+    def open_day(self, date, first_rows=()):
+        # first_rows are written after the header, only if the file is new
+        self._put((_OPEN_DAY, date, list(first_rows)))
+
+    def write(self, row):
+        self._put((_ROW, row))
+
+    def flush(self, timeout=5.0):
+        # Block until everything queued so far is on disk
+        done = threading.Event()
+        self._put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return True
+        self._closed = True
+        done = threading.Event()
+        deadline = time.monotonic() + timeout
+        try:
+            # A full queue behind a stalled or dead writer thread mustn't hang shutdown
+            self._queue.put((_CLOSE, done), timeout=timeout)
+        except queue.Full:
+            print("Error closing log writer: queue is still full")
+            return False
+        drained = done.wait(max(0.0, deadline - time.monotonic()))
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        return drained
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("Log writer is closed")
+        self._queue.put(item)
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._dirty and self.flush_policy == FLUSH_INTERVAL:
+                timeout = max(0.0, self._next_flush - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_file()
+                continue
+
+            # Group commit: take everything that's already waiting
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not self._process(batch):
+                return
+
+    def _process(self, batch):
+        start = time.perf_counter()
+        try:
+            return self._write_batch(batch)
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("log_write", (time.perf_counter() - start) * 1000)
+
+    def _write_batch(self, batch):
+        rows = 0
+        for item in batch:
+            kind = item[0]
+            try:
+                if kind == _ROW:
+                    row = item[1]
+                    self._open(row[0][:10], ())
+                    self._writer.writerow(row)
+                    if self.journal is not None:
+                        self.journal.append_row(row, self._date)
+                    rows += 1
+                elif kind == _OPEN_DAY:
+                    self._open(item[1], item[2])
+                else:
+                    self._commit(rows)
+                    rows = 0
+                    self._flush_file()
+                    if kind == _CLOSE:
+                        self._close_file()
+                        if self.journal is not None:
+                            self.journal.close()
+            except Exception as e:
+                self.errors += 1
+                print(f"Error logging activity: {e}")
+
+            if kind in (_FLUSH, _CLOSE):
+                item[1].set()
+                if kind == _CLOSE:
+                    return False
+
+        self._commit(rows)
+        return True
+
+    def _commit(self, rows):
+        if not rows:
+            return
+        self.rows_written += rows
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, rows)
+        if not self._dirty:
+            self._next_flush = time.monotonic() + self.flush_interval
+        self._dirty = True
+        if self.flush_policy == FLUSH_EVERY_EVENT:
+            self._flush_file()
+
+    def _open(self, date, first_rows):
+        if date == self._date:
+            return
+        self._flush_file()
+        self._close_file()
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = self.path_for(date)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+
+        self._file = open(path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        self._date = date
+
+        # Create file with headers if it doesn't exist
+        if is_new:
+            self._writer.writerow(LOG_HEADER)
+            self._writer.writerows(first_rows)
+            if self.journal is not None:
+                for row in first_rows:
+                    self.journal.append_row(row, date)
+            self._dirty = True
+            self._flush_file()
+
+    def _flush_file(self):
+        if self._file is None or not self._dirty:
+            return
+        start = time.perf_counter()
+        self._file.flush()
+        if self.journal is not None:
+            self.journal.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._dirty = False
+        self.flushes += 1
+        if self.metrics is not None:
+            self.metrics.observe("log_flush", (time.perf_counter() - start) * 1000)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
+        self._date = None
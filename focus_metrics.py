@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from focus_files import write_atomic
+
+PREFIX = "focus_reminder_"
+# Upper bounds in milliseconds; one more bucket catches everything above
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+PROM_FILE = "focus_reminder.prom"
+JSON_FILE = "focus_reminder_metrics.json"
+
+
+def percentile(samples, q):
+    # Nearest rank over raw samples, for the short windows components keep
+    # for their stats(); 0.0 when there are none
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def latency_summary(samples):
+    # Samples in seconds, summary in milliseconds
+    ordered = sorted(samples)
+    if not ordered:
+        return {"mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": round(percentile(ordered, 0.5) * 1000, 3),
+        "p99": round(percentile(ordered, 0.99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+class Histogram:
+    # Fixed buckets, so memory and observe() cost stay constant however long
+    # the app runs. Safe to observe from any thread.
+
+    def __init__(self, name, help_text, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(buckets_ms)
+        self.counts = array('Q', [0] * (len(self.bounds) + 1))
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        i = bisect_left(self.bounds, ms)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += ms
+            if ms > self.max:
+                self.max = ms
+
+    def quantile(self, q):
+        # Upper bound of the bucket the q-th observation falls in
+        with self._lock:
+            counts, count, top = list(self.counts), self.count, self.max
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for bound, n in zip(self.bounds + (top,), counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, top)
+        return top
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 3),
+        }
+
+
+class Metrics:
+    # Histograms the app observes into, plus gauges read from other
+    # components' stats() at export time. export() writes a Prometheus
+    # textfile (for node_exporter's textfile collector) and a JSON snapshot,
+    # each replaced atomically. The cost of probing and exporting is itself
+    # tracked, so the overhead can be checked against wall time.
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.histograms = {}
+        self._gauge_sources = []
+        self.started = time.perf_counter()
+        self.self_seconds = 0.0  # time spent in probes and exports
+        self.exports = 0
+
+    def histogram(self, name, help_text, buckets_ms=DEFAULT_BUCKETS_MS):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram(name, help_text, buckets_ms)
+        return hist
+
+    def observe(self, name, ms):
+        self.histograms[name].observe(ms)
+
+    def add_gauges(self, source):
+        # source() returns {name: number}
+        self._gauge_sources.append(source)
+
+    def gauges(self):
+        values = {}
+        for source in self._gauge_sources:
+            try:
+                values.update(source())
+            except Exception as e:
+                print(f"Error reading metrics: {e}")
+        elapsed = time.perf_counter() - self.started
+        values["instrumentation_overhead_ratio"] = self.self_seconds / elapsed if elapsed > 0 else 0.0
+        return values
+
+    def to_prometheus(self, gauges):
+        lines = []
+        for hist in self.histograms.values():
+            name = f"{PREFIX}{hist.name}_seconds"
+            with hist._lock:
+                counts, count, total = list(hist.counts), hist.count, hist.sum
+            lines.append(f"# HELP {name} {hist.help}")
+            lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(hist.bounds, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+            lines.append(f"{name}_sum {total / 1000:.6f}")
+            lines.append(f"{name}_count {count}")
+        for key, value in sorted(gauges.items()):
+            lines.append(f"# TYPE {PREFIX}{key} gauge")
+            lines.append(f"{PREFIX}{key} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self, gauges):
+        return {
+            "time": time.time(),
+            "histograms_ms": {name: hist.summary() for name, hist in self.histograms.items()},
+            "gauges": gauges,
+        }
+
+    def export(self):
+        start = time.perf_counter()
+        os.makedirs(self.out_dir, exist_ok=True)
+        gauges = self.gauges()
+        write_atomic(os.path.join(self.out_dir, PROM_FILE), self.to_prometheus(gauges))
+        write_atomic(os.path.join(self.out_dir, JSON_FILE), json.dumps(self.to_json(gauges), indent=2))
+        self.exports += 1
+        self.self_seconds += time.perf_counter() - start
+
+
+class LagProbe:
+    # Heartbeat on the Tk main loop: each tick asks to run again in
+    # interval_ms and records how late it actually ran. A busy or frozen
+    # main loop shows up as lag.
+
+    def __init__(self, root, metrics, interval_ms=250, name="tk_loop_lag"):
+        self.root = root
+        self.metrics = metrics
+        self.interval = interval_ms / 1000.0
+        self.histogram = metrics.histogram(name, "Delay of a Tk after() heartbeat beyond its schedule")
+        self._expected = None
+        self._after_id = None
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval
+        self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.histogram.observe(max(0.0, now - self._expected) * 1000)
+        self._expected = now + self.interval
+        self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+        self.metrics.self_seconds += time.perf_counter() - now
@@ -1,16 +1,46 @@
+import time
+_startup_marks = {"start": time.perf_counter()}  # for --startup-profile
+
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox, scrolledtext
-import threading
-import time
+_startup_marks["tkinter"] = time.perf_counter()
 import os
-import csv
+import json
+import argparse
 import datetime
-import pygame
-from functools import partial
+
+import focus_audio
+from focus_audio import (SoundBank, SoundPreparer, AmbientLoop, AudioChannels, INTERVAL_SOUND, BREAK_SOUND,
+                         CONCENTRATION_SOUND, CUE_CHANNEL_INTERVAL, CUE_CHANNEL_BREAK)
+from focus_timer import DeadlineTimer, PomodoroEngine, DaySchedule, CUE_INTERVAL, catch_up
+from focus_log import LogWriter, TIMESTAMP_FORMAT, FLUSH_POLICIES, FLUSH_INTERVAL
+from focus_history import add_history_arguments, run_history_command
+from focus_report import add_report_arguments, run_report_command
+from focus_journal import JournalWriter, add_journal_arguments, run_journal_command
+from focus_ui import ExpandedView, UpdateChannel, TimerDisplay
+from focus_checkpoint import SessionCheckpointer
+from focus_events import EventBus, load_hooks
+from focus_metrics import Metrics, LagProbe
+from focus_session import SessionModel
+_startup_marks["app_modules"] = time.perf_counter()
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+JOURNAL_PATH = os.path.join(LOG_DIR, "focus_journal")
+AUDIO_WARMUP_DELAY_MS = 300
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "focus_app_data",
+                               "session_checkpoint.json")
+CHECKPOINT_INTERVAL_MS = 2000
+HOOKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "focus_app_data", "hooks.json")
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "focus_app_data", "metrics")
+METRICS_EXPORT_MS = 15000
 
 class FocusReminderApp:
-    def __init__(self, root):
+    def __init__(self, root, log_writer=None, events=None, metrics=None, checkpointer=None,
+                 interactive=True):
         self.root = root
+        # Off for harnesses that drive the app without anyone at the screen:
+        # no setup wizard or resume prompt, and errors are printed
+        self.interactive = interactive
         self.root.title("Focus Reminder")
         
         # Set window position to bottom-left corner
@@ -24,22 +54,53 @@ class FocusReminderApp:
         self.paused = False
         self.expanded = False
         self.playing_concentration = False
-        self.pomodoro_count = 0
-        self.current_interval = 0  # 0, 1, 2 for work intervals, 3 for break
-        self.total_pomodoros_completed = 0
-        self.original_pomodoro_time = 0
-        self.pomodoro_time = 0
-        self.break_time = 0
-        self.time_remaining = 0
-        self.daily_intention = ""
-        self.goals = []
-        self.completed_goals = []
+        # Latency histograms, exported for when "the bell was late"
+        self.metrics = metrics or Metrics(METRICS_DIR)
+        for name, help_text in (
+                ("interval_end_gap", "How long after its scheduled end an interval was handled"),
+                ("log_activity", "Time log_activity takes on the Tk thread, queueing the row"),
+                ("sound_load", "Time to load a sound into the sound bank"),
+                ("sound_play", "Time the cue's channel play call takes"),
+                ("expanded_view_render", "Time to update the expanded view")):
+            self.metrics.histogram(name, help_text)
+        
+        # Interval state lives in the engine; this class only renders it
+        self.engine = PomodoroEngine()
+        # The day's remaining interval boundaries, for forecasts
+        self.schedule = DaySchedule()
+        # Intention, goals and the day's recent events
+        self.session = SessionModel()
         self.running = False
-        self.timer_thread = None
+        # Wall-clock end of the current interval while it counts down; stays put
+        # for the whole interval so checkpoints don't change every second
+        self.interval_ends_at = None
+        self.timer = DeadlineTimer(self.on_timer_tick, self.on_timer_expire)
+        # Timer thread -> Tk: ticks overwrite each other, interval ends are kept.
+        # Tk wakes when the next tick is due, or only when the minimized title
+        # or the interval's end needs it.
+        self.ui_updates = UpdateChannel(root, self.show_time_remaining, next_due=self.next_ui_update)
+        self.ui_updates.start()
         self.sound_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
         
-        # Initialize pygame mixer for sounds
-        pygame.mixer.init()
+        # Log rows are written by a background thread so disk latency never stalls the UI
+        self.log_writer = log_writer or LogWriter(LOG_DIR)
+        self.log_file = None
+        
+        # Integrations subscribe here and run off the Tk thread
+        self.events = events or EventBus()
+        
+        # Session state is checkpointed so a crash doesn't lose the day
+        self.checkpointer = checkpointer or SessionCheckpointer(CHECKPOINT_PATH)
+        
+        # Sounds are decoded once and kept, and cached on disk already converted
+        # to the mixer's format; pygame itself is loaded after the first frame
+        # is up (see warm_up_audio)
+        self.sound_bank = SoundBank(self.sound_folder, preparer=SoundPreparer(), metrics=self.metrics)
+        self.audio_warmup = None
+        # The ambient track is streamed from disk rather than kept in memory
+        ambient = AmbientLoop(os.path.join(self.sound_folder, CONCENTRATION_SOUND))
+        # Dedicated channels for each kind of cue; the ambient loop is ducked under them
+        self.audio = AudioChannels(self.sound_bank, ambient, metrics=self.metrics)
         
         # Main frame for the compact view
         self.main_frame = ttk.Frame(root)
@@ -48,13 +109,18 @@ class FocusReminderApp:
         # Timer label and controls
         self.timer_label = ttk.Label(self.main_frame, text="00:00", font=("Arial", 20))
         self.timer_label.pack(pady=5)
+        # Skips repaints that wouldn't change anything on screen
+        self.timer_display = TimerDisplay(root, self.timer_label)
+        root.bind("<Map>", self.on_map_change, add="+")
+        root.bind("<Unmap>", self.on_map_change, add="+")
         
         # Control buttons frame
         self.controls_frame = ttk.Frame(self.main_frame)
         self.controls_frame.pack(fill=tk.X)
         
-        # Buttons
-        self.start_pause_button = ttk.Button(self.controls_frame, text="Start", command=self.toggle_pause)
+        # Buttons; Start is enabled once the day is set up
+        self.start_pause_button = ttk.Button(self.controls_frame, text="Start", command=self.toggle_pause,
+                                             state="disabled")
         self.start_pause_button.pack(side=tk.LEFT, padx=2)
         
         self.concentration_button = ttk.Button(self.controls_frame, text="🔊", command=self.toggle_concentration)
@@ -71,9 +137,186 @@ class FocusReminderApp:
         
         # Expanded view frame (hidden initially)
         self.expanded_frame = ttk.Frame(root)
+        self.expanded_view = ExpandedView(self.expanded_frame, self.goal_completed, self.add_new_goal)
+        
+        # Resume today's session if one was interrupted, otherwise show the
+        # setup wizard to collect daily intention and goals
+        if interactive:
+            self.root.after(100, self.start_session)
+        self.root.after(CHECKPOINT_INTERVAL_MS, self.checkpoint_periodically)
+        self.root.after(AUDIO_WARMUP_DELAY_MS, self.warm_up_audio)
+        
+        # Main loop lag heartbeat and the periodic metrics export
+        self.lag_probe = LagProbe(root, self.metrics)
+        self.lag_probe.start()
+        self.metrics.add_gauges(self.metric_gauges)
+        self.root.after(METRICS_EXPORT_MS, self.export_metrics_periodically)
+    
+    def warm_up_audio(self):
+        # Import pygame, open the mixer and decode the cue bells in the background
+        # so interval boundaries never wait on the disk
+        self.audio_warmup = self.sound_bank.preload([INTERVAL_SOUND, BREAK_SOUND])
+    
+    def metric_gauges(self):
+        log = self.log_writer.stats()
+        hooks = self.events.stats()["hooks"].values()
+        sounds = self.sound_bank.stats()
+        updates = self.ui_updates.stats()
+        display = self.timer_display.stats()
+        return {
+            "timer_label_updates_total": display["label_updates"],
+            "timer_label_skipped_hidden_total": display["label_skipped_hidden"],
+            "timer_label_skipped_unchanged_total": display["label_skipped_unchanged"],
+            "timer_title_updates_total": display["title_updates"],
+            "timer_redraws_avoided_total": display["redraws_avoided"],
+            "ui_update_queue_depth": updates["depth"],
+            "ui_update_max_event_depth": updates["max_event_depth"],
+            "ui_update_state_latency_p99_ms": updates["state_latency_ms"]["p99"],
+            "ui_update_event_latency_p99_ms": updates["event_latency_ms"]["p99"],
+            "ui_update_states_coalesced_total": updates["states_coalesced"],
+            "ui_update_polls_total": updates["polls"],
+            "sound_cache_hits_total": sounds["hits"],
+            "sound_cache_misses_total": sounds["misses"],
+            "sound_cache_evictions_total": sounds["evictions"],
+            "sound_cache_used_bytes": sounds["used_bytes"],
+            "log_queued_rows": log["queued"],
+            "log_errors_total": log["errors"],
+            "hook_dropped_total": sum(hook["dropped"] for hook in hooks),
+            "hook_timeouts_total": sum(hook["timeouts"] for hook in hooks),
+            "checkpoint_writes_total": self.checkpointer.writes,
+            "pomodoros_completed": self.engine.total_pomodoros_completed,
+        }
+    
+    def export_metrics_periodically(self):
+        try:
+            self.metrics.export()
+        except OSError as e:
+            print(f"Error exporting metrics: {e}")
+        self.root.after(METRICS_EXPORT_MS, self.export_metrics_periodically)
+    
+    def start_session(self):
+        state = self.checkpointer.load()
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        if state is None or state["date"] != today or not state["goals"]:
+            self.show_setup_wizard()
+            return
+        
+        engine, missed = self.checkpoint_position(state)
+        minutes, seconds = divmod(engine.time_remaining, 60)
+        finished = sum(1 for _, transition in missed if transition.pomodoro_completed)
+        closed_note = f" ({finished} finished while the app was closed)" if finished else ""
+        if not messagebox.askyesno("Resume Session?",
+                                   f"Resume today's session \"{state['daily_intention']}\" at "
+                                   f"Pomodoro #{engine.total_pomodoros_completed+1}{closed_note} "
+                                   f"with {minutes:02d}:{seconds:02d} left?"):
+            self.checkpointer.clear()
+            self.show_setup_wizard()
+            return
+        self.resume_session(state, engine, missed)
+    
+    def checkpoint_position(self, state):
+        # Where the checkpointed session is now, on a scratch engine. A running
+        # interval kept counting while the app was down, and so did the ones
+        # after it; returns the engine and the transitions it stepped through.
+        engine = PomodoroEngine()
+        if not state["running"] or state["paused"]:
+            engine.restore(state["engine"], state["time_remaining"])
+            return engine, []
+        engine.restore(state["engine"], 0)
+        missed, ends_at = catch_up(engine, state["interval_ends_at"], time.time())
+        engine.time_remaining = max(0, int(ends_at - time.time()))
+        return engine, missed
+    
+    def resume_session(self, state, engine, missed=()):
+        self.session.restore(state["daily_intention"], state["goals"], state["completed_goals"])
+        self.engine.restore(engine.snapshot(), engine.time_remaining)
+        remaining = engine.time_remaining
+        self.start_pause_button.config(state="normal")
+        
+        # Log what happened while the app was closed, at the time it happened
+        for ended_at, transition in missed:
+            if transition.pomodoro_completed:
+                self.log_activity("pomodoro_completed", f"Pomodoro #{transition.pomodoro_completed}",
+                                  "While the app was closed",
+                                  timestamp=datetime.datetime.fromtimestamp(ended_at).strftime(TIMESTAMP_FORMAT))
+                self.events.publish("pomodoro_completed", pomodoro=transition.pomodoro_completed, missed=True)
+        
+        if not state["running"]:
+            self.replan()
+        else:
+            self.running = True
+            self.timer.start(remaining)
+            self.mark_deadline(remaining)
+            if state["paused"]:
+                self.paused = True
+                self.timer.pause()
+            self.ui_updates.set_active(not self.paused)
+            self.start_pause_button.config(text="Resume" if self.paused else "Pause")
+            if missed:
+                self.publish_interval_started()
         
-        # Show setup wizard to collect daily intention and goals
-        self.root.after(100, self.show_setup_wizard)
+        self.update_timer_display()
+        self.setup_expanded_view()
+        self.ensure_log_file_exists()
+    
+    def mark_deadline(self, seconds, chained=False):
+        # Remember the wall-clock end of the interval the timer is counting down
+        if chained and self.interval_ends_at is not None:
+            self.interval_ends_at += seconds
+        else:
+            # Started, resumed or reconfigured: everything after now has moved
+            self.interval_ends_at = time.time() + seconds
+            self.replan()
+    
+    def replan(self):
+        # Recompute the day's forecast from the current interval on; a paused
+        # or not yet started timer is forecast as if it ran from now
+        if self.engine.pomodoro_time <= 0:
+            return  # Nothing to forecast until the day is set up
+        if self.running and not self.paused and self.interval_ends_at is not None:
+            ends_at = self.interval_ends_at
+        else:
+            ends_at = time.time() + self.engine.time_remaining
+        self.schedule.plan(self.engine, ends_at)
+    
+    def forecast_text(self):
+        if self.paused:
+            return ""  # Replanned on resume
+        n = self.engine.total_pomodoros_completed + 1
+        end = self.schedule.pomodoro_end(n)
+        if end is None:
+            return ""
+        return f"Pom #{n} done at {datetime.datetime.fromtimestamp(end):%H:%M}"
+    
+    def session_state(self):
+        state = {
+            "date": datetime.datetime.now().strftime("%Y-%m-%d"),
+            "daily_intention": self.session.daily_intention,
+            "goals": self.session.goals,
+            "completed_goals": self.session.completed_goals,
+            "engine": self.engine.snapshot(),
+            "running": self.running,
+            "paused": self.paused,
+        }
+        if self.running and not self.paused:
+            # The deadline only changes at interval boundaries, unlike the countdown
+            state["interval_ends_at"] = round(self.interval_ends_at, 1)
+        else:
+            state["time_remaining"] = self.engine.time_remaining
+        return state
+    
+    def checkpoint(self):
+        if not self.session.has_goals():
+            return  # Nothing worth resuming until the day is set up
+        try:
+            self.checkpointer.save(self.session_state())
+        except OSError as e:
+            print(f"Error saving session checkpoint: {e}")
+    
+    def checkpoint_periodically(self):
+        # Writes only when something changed since the last checkpoint
+        self.checkpoint()
+        self.root.after(CHECKPOINT_INTERVAL_MS, self.checkpoint_periodically)
     
     def show_setup_wizard(self):
         # Create wizard window
@@ -83,6 +326,15 @@ class FocusReminderApp:
         wizard.transient(self.root)
         wizard.grab_set()
         
+        def close_wizard():
+            # Without a Pomodoro length there is nothing to run
+            if self.engine.pomodoro_time > 0:
+                wizard.destroy()
+            elif messagebox.askyesno("Quit?", "The day isn't set up yet. Quit Focus Reminder?", parent=wizard):
+                self.root.destroy()
+        
+        wizard.protocol("WM_DELETE_WINDOW", close_wizard)
+        
         # Daily intention
         ttk.Label(wizard, text="Your daily intention (max 28 chars):", font=("Arial", 12)).pack(pady=(20, 5))
         intention_entry = ttk.Entry(wizard, width=30)
@@ -131,6 +383,9 @@ class FocusReminderApp:
             if not goals:
                 messagebox.showwarning("Input Required", "Please enter at least one goal")
                 return
+            if len(set(goals)) != len(goals):
+                messagebox.showwarning("Duplicate Goals", "Each goal can only be listed once")
+                return
             
             try:
                 pomodoro_time = int(time_entry.get())
@@ -141,14 +396,16 @@ class FocusReminderApp:
                 return
             
             # Save the settings
-            self.daily_intention = intention
-            self.goals = goals
-            self.original_pomodoro_time = pomodoro_time * 60
-            self.pomodoro_time = self.original_pomodoro_time
-            self.break_time = max(6 * 60, int(self.pomodoro_time * 0.2))  # 6 minutes or 20% of pomodoro time
+            self.session.start_day(intention, goals)
             
             # Initialize timer
-            self.time_remaining = self.pomodoro_time // 3  # First interval is 1/3 of pomodoro time
+            self.engine.configure(pomodoro_time * 60)
+            self.start_pause_button.config(state="normal")
+            if self.running:
+                self.timer.reset(self.engine.time_remaining)
+                self.mark_deadline(self.engine.time_remaining)
+            else:
+                self.replan()
             self.update_timer_display()
             
             # Setup the expanded view
@@ -157,6 +414,8 @@ class FocusReminderApp:
             # Create log file for the day if it doesn't exist
             self.ensure_log_file_exists()
             
+            self.checkpoint()
+            
             # Close the wizard
             wizard.destroy()
         
@@ -164,56 +423,10 @@ class FocusReminderApp:
         intention_entry.focus_set()
     
     def setup_expanded_view(self):
-        # Clear any existing widgets
-        for widget in self.expanded_frame.winfo_children():
-            widget.destroy()
-        
-        # Daily intention display
-        intention_frame = ttk.Frame(self.expanded_frame)
-        intention_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(intention_frame, text="Daily Intention:", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-        ttk.Label(intention_frame, text=self.daily_intention, font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
-        
-        # Goals display with checkboxes
-        goals_frame = ttk.Frame(self.expanded_frame)
-        goals_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(goals_frame, text="Goals:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
-        
-        for i, goal in enumerate(self.goals):
-            if goal in self.completed_goals:
-                continue
-            
-            goal_frame = ttk.Frame(goals_frame)
-            goal_frame.pack(fill=tk.X, pady=2)
-            
-            var = tk.BooleanVar(value=False)
-            cb = ttk.Checkbutton(goal_frame, text=goal, variable=var, 
-                               command=lambda g=goal, v=var: self.goal_completed(g, v))
-            cb.pack(side=tk.LEFT, padx=5)
-        
-        # Completed goals (strikethrough)
-        if self.completed_goals:
-            completed_frame = ttk.Frame(self.expanded_frame)
-            completed_frame.pack(fill=tk.X, pady=5)
-            
-            ttk.Label(completed_frame, text="Completed:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
-            
-            for goal in self.completed_goals:
-                ttk.Label(completed_frame, text=f"✓ {goal}", foreground="green").pack(anchor=tk.W, padx=15)
-        
-        # Status display
-        status_frame = ttk.Frame(self.expanded_frame)
-        status_frame.pack(fill=tk.X, pady=5)
-        
-        ttk.Label(status_frame, text=f"Pomodoros completed: {self.total_pomodoros_completed}").pack(side=tk.LEFT, padx=5)
-        
-        # Add goal button (if all goals are completed)
-        if all(goal in self.completed_goals for goal in self.goals) and self.goals:
-            add_goal_button = ttk.Button(self.expanded_frame, text="Add New Goal", 
-                                       command=self.add_new_goal)
-            add_goal_button.pack(pady=10)
+        # Only the widgets whose goal or status changed are touched
+        start = time.perf_counter()
+        self.expanded_view.render(self.session, self.engine.total_pomodoros_completed, self.forecast_text())
+        self.metrics.observe("expanded_view_render", (time.perf_counter() - start) * 1000)
     
     def toggle_expand(self):
         if self.expanded:
@@ -249,20 +462,23 @@ class FocusReminderApp:
                                           f"Remarks for completing: {goal}", 
                                           parent=self.root)
             
-            # Add to completed goals
-            if goal not in self.completed_goals:
-                self.completed_goals.append(goal)
-            
-            # Log the completion
-            self.log_activity("goal_completed", goal, remarks)
-            
-            # Refresh the expanded view
-            self.setup_expanded_view()
-            
-            # Check if all goals are completed
-            if all(goal in self.completed_goals for goal in self.goals):
+            if self.complete_goal(goal, remarks):
                 self.check_day_finished()
     
+    def complete_goal(self, goal, remarks):
+        # Add to completed goals
+        self.session.complete_goal(goal, remarks)
+        
+        # Log the completion
+        self.log_activity("goal_completed", goal, remarks)
+        self.events.publish("goal_completed", goal=goal, remarks=remarks or "")
+        
+        # Refresh the expanded view
+        self.setup_expanded_view()
+        
+        # Whether every goal is now done
+        return self.session.all_completed()
+    
     def check_day_finished(self):
         # Ask if day is finished
         if messagebox.askyesno("Day Finished?", 
@@ -279,7 +495,7 @@ class FocusReminderApp:
         
         # Daily intention review
         ttk.Label(dialog, text=f"Your daily intention:", font=("Arial", 12)).pack(pady=(20, 5))
-        ttk.Label(dialog, text=self.daily_intention, font=("Arial", 12, "bold")).pack(pady=(0, 15))
+        ttk.Label(dialog, text=self.session.daily_intention, font=("Arial", 12, "bold")).pack(pady=(0, 15))
         
         # Rating
         ttk.Label(dialog, text="How well did you achieve your intention? (1-10)", 
@@ -325,6 +541,12 @@ class FocusReminderApp:
             
             # Log the end of day
             self.log_activity("end_of_day", f"Rating: {rating}", comments)
+            self.events.publish("end_of_day", rating=rating, comments=comments)
+            
+            # Make sure every queued row is on disk before the window goes away
+            self.log_writer.close()
+            # The day is over; there is nothing to resume
+            self.checkpointer.clear()
             
             # Close dialog and app
             dialog.destroy()
@@ -337,15 +559,18 @@ class FocusReminderApp:
             
             # Log the end of day
             self.log_activity("end_of_day", f"Rating: {rating}", comments)
+            self.events.publish("end_of_day", rating=rating, comments=comments)
+            self.log_writer.flush()
             
             # Reset app state
-            self.daily_intention = ""
-            self.goals = []
-            self.completed_goals = []
-            self.total_pomodoros_completed = 0
-            self.pomodoro_count = 0
-            self.current_interval = 0
+            self.session.reset_day()
+            self.engine.reset_day()
+            self.schedule.clear()
             self.paused = True
+            self.timer.pause()
+            self.ui_updates.set_active(False)
+            self.start_pause_button.config(text="Resume")
+            self.checkpointer.clear()
             
             # Close dialog and restart
             dialog.destroy()
@@ -357,35 +582,57 @@ class FocusReminderApp:
                                        "Enter a new goal (max 28 chars):", 
                                        parent=self.root)
         
+        new_goal = (new_goal or "").strip()[:28]
         if new_goal:
-            self.goals.append(new_goal[:28])
+            if not self.session.add_goal(new_goal):
+                messagebox.showinfo("Goal Exists", f"\"{new_goal}\" is already on today's list")
+                return
             self.setup_expanded_view()
     
     def toggle_pause(self):
+        if self.engine.pomodoro_time <= 0:
+            return  # Not set up yet
         if not self.running:
             # Start the timer
             self.running = True
             self.paused = False
             self.start_pause_button.config(text="Pause")
             
-            # Start timer in a new thread
-            self.timer_thread = threading.Thread(target=self.run_timer)
-            self.timer_thread.daemon = True
-            self.timer_thread.start()
+            # Start counting down against a deadline in the timer thread
+            self.timer.start(self.engine.time_remaining)
+            self.ui_updates.set_active(True)
+            self.mark_deadline(self.engine.time_remaining)
+            self.setup_expanded_view()
+            self.publish_interval_started()
         else:
             # Toggle pause state
             self.paused = not self.paused
             
             if self.paused:
+                self.timer.pause()
+                self.ui_updates.set_active(False)
+                self.engine.time_remaining = self.timer.remaining()
+                self.checkpoint()
+                self.setup_expanded_view()
                 self.start_pause_button.config(text="Resume")
-                # Log pause event
+                # Log pause event, stamped before the dialog so reports see the
+                # whole pause; the reason is optional
+                paused_at = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
                 reason = simpledialog.askstring("Pause", 
                                            "Reason for pausing:", 
                                            parent=self.root)
-                if reason:
-                    self.log_activity("pause", "Timer paused", reason)
+                self.log_activity("pause", "Timer paused", reason or "", timestamp=paused_at)
+                self.events.publish("pause", reason=reason or "")
             else:
+                self.timer.resume()
+                self.ui_updates.set_active(True)
+                self.mark_deadline(self.timer.remaining())
+                self.checkpoint()
+                self.setup_expanded_view()
                 self.start_pause_button.config(text="Pause")
+                # Log resume so reports can tell how long the pause lasted
+                self.log_activity("resume", "Timer resumed", "")
+                self.events.publish("resume")
     
     def open_gedit(self):
         try:
@@ -404,138 +651,248 @@ class FocusReminderApp:
             self.play_concentration_sound()
         else:
             self.concentration_button.config(text="🔊")
-            pygame.mixer.stop()
+            self.audio.stop_ambient()
     
     def play_concentration_sound(self):
         try:
-            concentration_sound = os.path.join(self.sound_folder, "2_min_concetration.wav")
-            sound = pygame.mixer.Sound(concentration_sound)
-            sound.play(loops=-1)  # Loop continuously
+            self.audio.play_ambient()  # Loop continuously
         except Exception as e:
-            messagebox.showerror("Error", f"Could not play concentration sound: {e}")
+            self.show_error(f"Could not play concentration sound: {e}")
             self.playing_concentration = False
             self.concentration_button.config(text="🔊")
     
+    def show_error(self, message):
+        if self.interactive:
+            messagebox.showerror("Error", message)
+        else:
+            print(message)
+    
     def play_interval_sound(self):
         try:
-            interval_sound = os.path.join(self.sound_folder, "short_0.333_pom_cue_bell.wav")
-            pygame.mixer.Sound(interval_sound).play()
+            self.audio.play_cue(CUE_CHANNEL_INTERVAL, INTERVAL_SOUND)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not play interval sound: {e}")
+            self.show_error(f"Could not play interval sound: {e}")
     
     def play_break_sound(self):
         try:
-            break_sound = os.path.join(self.sound_folder, "break_meditate_cue_bell.wav")
-            pygame.mixer.Sound(break_sound).play()
+            self.audio.play_cue(CUE_CHANNEL_BREAK, BREAK_SOUND)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not play break sound: {e}")
-    
-    def run_timer(self):
-        while self.running:
-            if not self.paused:
-                # Update time remaining
-                if self.time_remaining > 0:
-                    self.time_remaining -= 1
-                    
-                    # Update UI
-                    self.root.after(0, self.update_timer_display)
-                    
-                    # Sleep for a second
-                    time.sleep(1)
-                else:
-                    # End of current interval
-                    self.root.after(0, self.handle_interval_end)
-                    
-                    # Sleep to prevent CPU hogging
-                    time.sleep(0.5)
-            else:
-                # Paused, just sleep
-                time.sleep(0.5)
+            self.show_error(f"Could not play break sound: {e}")
+    
+    def next_ui_update(self):
+        # Seconds until the timer posts something the window would show: every
+        # second, or while minimized only the minute changes in the title
+        return self.timer.until_change(1 if self.timer_display.mapped else 60)
+    
+    def on_map_change(self, event):
+        if event.widget is self.root:
+            self.ui_updates.reschedule()
+    
+    def on_timer_tick(self, remaining):
+        # Called from the timer thread whenever the displayed second changes
+        self.ui_updates.post_state(remaining)
+    
+    def on_timer_expire(self):
+        # Called from the timer thread once per interval
+        self.ui_updates.post_event(self.handle_interval_end)
+    
+    def show_time_remaining(self, remaining):
+        self.engine.time_remaining = remaining
+        self.update_timer_display()
     
     def handle_interval_end(self):
+        if self.interval_ends_at is not None and not self.paused:
+            self.metrics.observe("interval_end_gap", max(0.0, time.time() - self.interval_ends_at) * 1000)
+        transition = self.engine.advance()
+        
         # Play appropriate sound
-        if self.current_interval < 3:  # End of work interval
+        if transition.cue == CUE_INTERVAL:  # End of work interval
             self.play_interval_sound()
         else:  # End of break
             self.play_break_sound()
         
-        # Move to next interval
-        self.current_interval = (self.current_interval + 1) % 4
+        # Log completed pomodoro
+        if transition.pomodoro_completed:
+            self.log_activity("pomodoro_completed", f"Pomodoro #{transition.pomodoro_completed}", "")
+            self.events.publish("pomodoro_completed", pomodoro=transition.pomodoro_completed)
+            # The count and the next forecast changed
+            self.setup_expanded_view()
         
-        # Update pomodoro count and time if needed
-        if self.current_interval == 0:
-            self.pomodoro_count += 1
-            self.total_pomodoros_completed += 1
-            
-            # Log completed pomodoro
-            self.log_activity("pomodoro_completed", f"Pomodoro #{self.total_pomodoros_completed}", "")
-            
-            # Adaptive pomodoro timing
-            if self.pomodoro_count % 4 == 0:
-                # After every 4 pomodoros, adjust time
-                if self.pomodoro_count <= 4:
-                    self.pomodoro_time = self.original_pomodoro_time
-                elif self.pomodoro_count <= 8:
-                    self.pomodoro_time = int(self.original_pomodoro_time * 0.9)  # 10% reduction
-                else:
-                    self.pomodoro_time = int(self.original_pomodoro_time * 0.8)  # 20% reduction
-        
-        # Set new time remaining
-        if self.current_interval < 3:  # Work interval (1/3 of pomodoro)
-            self.time_remaining = self.pomodoro_time // 3
-        else:  # Break
-            self.time_remaining = self.break_time
+        # Schedule the next interval from the previous deadline so delays don't add up
+        self.timer.chain(self.engine.time_remaining)
+        self.mark_deadline(self.engine.time_remaining, chained=True)
+        self.checkpoint()
+        self.publish_interval_started()
         
         # Update display
         self.update_timer_display()
     
+    def publish_interval_started(self):
+        engine = self.engine
+        self.events.publish("interval_started",
+                            interval=f"W{engine.current_interval+1}" if engine.is_work() else "Break",
+                            seconds=engine.time_remaining, pomodoro=engine.total_pomodoros_completed + 1)
+    
     def update_timer_display(self):
-        minutes, seconds = divmod(self.time_remaining, 60)
+        engine = self.engine
+        minutes, seconds = divmod(engine.time_remaining, 60)
         timer_text = f"{minutes:02d}:{seconds:02d}"
         
         # Add indicator for work/break
-        if self.current_interval < 3:
-            status = f"W{self.current_interval+1}"  # Work interval 1, 2, or 3
+        if engine.is_work():
+            status = f"W{engine.current_interval+1}"  # Work interval 1, 2, or 3
         else:
             status = "Break"
         
-        # Update label
-        self.timer_label.config(text=f"{timer_text} ({status})")
-        
-        # Update title for better visibility when minimized
-        self.root.title(f"{timer_text} | Pom #{self.total_pomodoros_completed+1}")
+        # Update label and title (for better visibility when minimized); while
+        # minimized the title only shows whole minutes so it changes once a minute
+        pom = f"Pom #{engine.total_pomodoros_completed+1}"
+        whole_minutes = minutes + (1 if seconds else 0)
+        self.timer_display.show(f"{timer_text} ({status})", f"{timer_text} | {pom}",
+                                f"{whole_minutes} min {status} | {pom}")
     
     def ensure_log_file_exists(self):
-        log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        
         today = datetime.datetime.now().strftime("%Y-%m-%d")
-        self.log_file = os.path.join(log_dir, f"focus_log_{today}.csv")
-        
-        # Create file with headers if it doesn't exist
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Timestamp", "Event", "Detail", "Remarks"])
-                writer.writerow([datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-                               "day_started", f"Intention: {self.daily_intention}", 
-                               f"Goals: {', '.join(self.goals)}"])
-    
-    def log_activity(self, event_type, detail, remarks):
+        if self.log_file == self.log_writer.path_for(today):
+            return
+        self.log_file = self.log_writer.path_for(today)
+        
+        # The writer creates the file with headers if it doesn't exist
+        self.log_writer.open_day(today, [[datetime.datetime.now().strftime(TIMESTAMP_FORMAT), 
+                                          "day_started", f"Intention: {self.session.daily_intention}", 
+                                          f"Goals: {', '.join(self.session.goals)}"]])
+    
+    def log_activity(self, event_type, detail, remarks, timestamp=None):
+        start = time.perf_counter()
+        timestamp = timestamp or datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
         try:
             self.ensure_log_file_exists()
-            with open(self.log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    event_type,
-                    detail,
-                    remarks
-                ])
+            self.log_writer.write([
+                timestamp,
+                event_type,
+                detail,
+                remarks
+            ])
         except Exception as e:
             print(f"Error logging activity: {e}")
+        self.session.record(timestamp, event_type, detail, remarks)
+        self.metrics.observe("log_activity", (time.perf_counter() - start) * 1000)
+        
+        # Keep the recent events list current while it is on screen; callers
+        # re-render the rest of the view when they change it
+        if self.expanded:
+            self.expanded_view.render_recent(self.session)
 
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = FocusReminderApp(root)
+class StartupProfile:
+    # Times each launch phase up to the first frame, then the background audio
+    # warm-up, prints them as JSON and closes the app
+    
+    def __init__(self):
+        marks = _startup_marks
+        self.phases = {
+            "import_tkinter": marks["tkinter"] - marks["start"],
+            "import_app_modules": marks["app_modules"] - marks["tkinter"],
+        }
+        self.start = marks["start"]
+        self.first_frame = None
+    
+    def measure(self, phase, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.phases[phase] = time.perf_counter() - started
+        return result
+    
+    def attach(self, root, app):
+        self.root = root
+        self.app = app
+        root.bind("<Expose>", self._on_expose, add="+")
+    
+    def _on_expose(self, event):
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.start
+            self.root.after(50, self._wait_for_audio)
+    
+    def _wait_for_audio(self):
+        warmup = self.app.audio_warmup
+        if warmup is None or warmup.is_alive():
+            self.root.after(50, self._wait_for_audio)
+            return
+        
+        phases = dict(self.phases)
+        phases.update(focus_audio.timings)
+        for name, seconds in self.app.sound_bank.stats()["load_times"].items():
+            phases[f"load {name}"] = seconds
+        print(json.dumps({
+            "time_to_first_frame_ms": round(self.first_frame * 1000, 1),
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in phases.items()},
+            "audio_errors": self.app.sound_bank.stats()["load_errors"],
+        }, indent=2))
+        self.root.destroy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Focus Reminder")
+    parser.add_argument("--log-flush", choices=FLUSH_POLICIES, default=FLUSH_INTERVAL,
+                        help="when log rows are flushed to disk")
+    parser.add_argument("--log-flush-ms", type=int, default=1000,
+                        help="flush interval for --log-flush interval")
+    parser.add_argument("--log-fsync", action="store_true", help="fsync the log file on every flush")
+    parser.add_argument("--journal", action="store_true",
+                        help="also append every event to the binary journal in logs/")
+    parser.add_argument("--audio-buffer", type=int, default=focus_audio.mixer_settings["buffer"],
+                        help="mixer buffer in samples; smaller means lower cue latency")
+    parser.add_argument("--audio-fallback-buffer", type=int,
+                        default=focus_audio.mixer_settings["fallback_buffer"],
+                        help="buffer to retry with if the device rejects --audio-buffer")
+    parser.add_argument("--hooks", default=HOOKS_PATH,
+                        help="JSON list of commands to run on app events (see README)")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR,
+                        help="where the Prometheus textfile and JSON metrics snapshot are written")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print time to first frame and per-phase startup costs, then exit")
+    
+    commands = parser.add_subparsers(dest="command")
+    add_history_arguments(commands.add_parser("history", help="query past days from the logs"))
+    add_report_arguments(commands.add_parser("report", help="summarize the whole log archive"))
+    add_journal_arguments(commands.add_parser("journal", help="convert between CSV logs and the journal"),
+                          JOURNAL_PATH)
+    args = parser.parse_args(argv)
+    
+    if args.command == "history":
+        run_history_command(args, LOG_DIR)
+        return
+    if args.command == "report":
+        run_report_command(args, LOG_DIR)
+        return
+    if args.command == "journal":
+        run_journal_command(args, LOG_DIR)
+        return
+    
+    focus_audio.configure_mixer(buffer=args.audio_buffer, fallback_buffer=args.audio_fallback_buffer)
+    
+    journal = None
+    if args.journal:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        journal = JournalWriter(JOURNAL_PATH)
+    metrics = Metrics(args.metrics_dir)
+    log_writer = LogWriter(LOG_DIR, flush_policy=args.log_flush,
+                           flush_interval_ms=args.log_flush_ms, fsync=args.log_fsync,
+                           journal=journal, metrics=metrics)
+    events = EventBus()
+    load_hooks(events, args.hooks)
+    if args.startup_profile:
+        profile = StartupProfile()
+        root = profile.measure("tk_root", tk.Tk)
+        app = profile.measure("app_init", FocusReminderApp, root, log_writer, events, metrics)
+        profile.attach(root, app)
+    else:
+        root = tk.Tk()
+        app = FocusReminderApp(root, log_writer=log_writer, events=events, metrics=metrics)
     root.mainloop()
+    
+    # Drain anything still queued when the window is closed
+    log_writer.close()
+    events.close()
+    metrics.export()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import csv
+import datetime
+import hashlib
+import html
+import json
+import os
+import random
+import sys
+import time
+
+from focus_files import write_atomic
+from focus_log import LOG_HEADER, TIMESTAMP_FORMAT
+from focus_history import LOG_NAME_PATTERN, parse_rating
+
+CACHE_NAME = ".report_cache.json"
+CACHE_VERSION = 2
+REPORT_FORMATS = ("json", "html")
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def summarize_file(path):
+    # Streams one day's log and reduces it to that day's totals
+    partial = {
+        "rows": 0,
+        "pomodoros": 0,
+        "pauses": 0,
+        "pause_seconds": 0,
+        "goals_planned": 0,
+        "goals_completed": 0,
+        "ratings": [],
+    }
+    paused_at = None
+    with open(path, newline='', encoding="utf-8", errors="replace") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or row == LOG_HEADER:
+                continue
+            partial["rows"] += 1
+            event = row[1]
+            detail = row[2] if len(row) > 2 else ""
+
+            if event == "pomodoro_completed":
+                partial["pomodoros"] += 1
+            elif event == "pause":
+                partial["pauses"] += 1
+                paused_at = _parse_timestamp(row[0])
+            elif event == "resume":
+                if paused_at is None:
+                    # Older logs only have a pause row when a reason was given;
+                    # the pause still happened, its length is unknown
+                    partial["pauses"] += 1
+                resumed_at = _parse_timestamp(row[0])
+                if paused_at and resumed_at and resumed_at >= paused_at:
+                    partial["pause_seconds"] += int((resumed_at - paused_at).total_seconds())
+                paused_at = None
+            elif event == "goal_completed":
+                partial["goals_completed"] += 1
+            elif event == "day_started":
+                goals = row[3][len("Goals: "):] if len(row) > 3 else ""
+                partial["goals_planned"] = max(partial["goals_planned"],
+                                               len([g for g in goals.split(", ") if g]))
+            elif event == "end_of_day":
+                rating = parse_rating(detail)
+                if rating is not None:
+                    partial["ratings"].append(rating)
+    return partial
+
+
+def summarize_chunk(tasks):
+    # Runs in a worker process: tasks are (path, hash we already have a result for)
+    results = []
+    for path, known_hash in tasks:
+        digest = file_hash(path)
+        if digest == known_hash:
+            results.append((path, digest, None))
+        else:
+            results.append((path, digest, summarize_file(path)))
+    return results
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+class ReportBuilder:
+    # Summarizes a whole logs/ directory in parallel. Each file's partial
+    # result is cached by content hash, so a re-run only parses the days that
+    # changed since the last report.
+
+    def __init__(self, log_dir, cache_path=None, jobs=None, chunk_size=16):
+        self.log_dir = log_dir
+        self.cache_path = cache_path or os.path.join(log_dir, CACHE_NAME)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache = self._load_cache()
+        self.stats = {}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data["files"]
+
+    def _save_cache(self):
+        write_atomic(self.cache_path, json.dumps({"version": CACHE_VERSION, "files": self.cache},
+                                                 separators=(",", ":")))
+
+    def build(self):
+        start = time.perf_counter()
+        days = {}
+        tasks = []
+        reused = 0
+        names = sorted(os.listdir(self.log_dir)) if os.path.isdir(self.log_dir) else []
+        for name in names:
+            match = LOG_NAME_PATTERN.match(name)
+            if not match:
+                continue
+            path = os.path.join(self.log_dir, name)
+            stat = os.stat(path)
+            entry = self.cache.get(name)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                days[match.group(1)] = entry["partial"]
+                reused += 1
+            else:
+                tasks.append((path, entry["hash"] if entry else None))
+
+        parsed_rows = 0
+        parsed_files = 0
+        chunks = [tasks[i:i + self.chunk_size] for i in range(0, len(tasks), self.chunk_size)]
+        if chunks:
+            if self.jobs == 1 or len(chunks) == 1:
+                results = map(summarize_chunk, chunks)
+                pool = None
+            else:
+                # Imported here: multiprocessing is slow to import and the GUI
+                # imports this module at startup
+                from concurrent.futures import ProcessPoolExecutor
+                pool = ProcessPoolExecutor(max_workers=min(self.jobs, len(chunks)))
+                results = pool.map(summarize_chunk, chunks)
+            try:
+                for chunk in results:
+                    for path, digest, partial in chunk:
+                        name = os.path.basename(path)
+                        if partial is None:
+                            # Touched but not changed
+                            partial = self.cache[name]["partial"]
+                            reused += 1
+                        else:
+                            parsed_rows += partial["rows"]
+                            parsed_files += 1
+                        stat = os.stat(path)
+                        self.cache[name] = {"size": stat.st_size, "mtime": stat.st_mtime,
+                                            "hash": digest, "partial": partial}
+                        days[LOG_NAME_PATTERN.match(name).group(1)] = partial
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+        for name in list(self.cache):
+            if LOG_NAME_PATTERN.match(name).group(1) not in days:
+                del self.cache[name]
+        if names:
+            self._save_cache()
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "files_parsed": parsed_files,
+            "files_cached": reused,
+            "rows_parsed": parsed_rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(parsed_rows / elapsed) if elapsed > 0 else 0,
+            "jobs": self.jobs,
+        }
+        return build_summary(days)
+
+
+def build_summary(days):
+    totals = {"days": len(days), "rows": 0, "pomodoros": 0, "pauses": 0, "pause_seconds": 0,
+              "goals_planned": 0, "goals_completed": 0}
+    ratings = []
+    months = {}
+    per_day = []
+    for date in sorted(days):
+        partial = days[date]
+        for key in totals:
+            if key != "days":
+                totals[key] += partial[key]
+        ratings.extend(partial["ratings"])
+
+        month = months.setdefault(date[:7], {"days": 0, "pomodoros": 0, "pauses": 0, "ratings": []})
+        month["days"] += 1
+        month["pomodoros"] += partial["pomodoros"]
+        month["pauses"] += partial["pauses"]
+        month["ratings"].extend(partial["ratings"])
+
+        per_day.append({
+            "date": date,
+            "pomodoros": partial["pomodoros"],
+            "pauses": partial["pauses"],
+            "pause_minutes": round(partial["pause_seconds"] / 60, 1),
+            "goal_completion": _rate(partial["goals_completed"], partial["goals_planned"]),
+            "rating": _mean(partial["ratings"]),
+        })
+
+    return {
+        "totals": totals,
+        "average_rating": _mean(ratings),
+        "goal_completion": _rate(totals["goals_completed"], totals["goals_planned"]),
+        "pomodoros_per_day": round(totals["pomodoros"] / len(days), 2) if days else None,
+        "months": [{"month": month, "days": m["days"], "pomodoros": m["pomodoros"],
+                    "pauses": m["pauses"], "rating": _mean(m["ratings"])}
+                   for month, m in sorted(months.items())],
+        "days": per_day,
+    }
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def _rate(done, planned):
+    # Goals added during the day can push completion over 100%
+    return round(done / planned, 2) if planned else None
+
+
+def render_html(summary):
+    def table(rows, columns):
+        head = "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+        body = "".join(
+            "<tr>" + "".join(f"<td>{html.escape('' if row[c] is None else str(row[c]))}</td>"
+                             for c in columns) + "</tr>"
+            for row in rows)
+        return f"<table><tr>{head}</tr>{body}</table>"
+
+    totals = summary["totals"]
+    overview = [
+        {"metric": "Days", "value": totals["days"]},
+        {"metric": "Pomodoros", "value": totals["pomodoros"]},
+        {"metric": "Pomodoros per day", "value": summary["pomodoros_per_day"]},
+        {"metric": "Pauses", "value": totals["pauses"]},
+        {"metric": "Minutes paused", "value": round(totals["pause_seconds"] / 60, 1)},
+        {"metric": "Goal completion", "value": summary["goal_completion"]},
+        {"metric": "Average rating", "value": summary["average_rating"]},
+    ]
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Focus Report</title>"
+        "<style>body{font-family:Arial,sans-serif}table{border-collapse:collapse;margin-bottom:2em}"
+        "td,th{border:1px solid #ccc;padding:2px 8px;text-align:right}</style></head><body>"
+        "<h1>Focus Report</h1>"
+        + table(overview, ["metric", "value"])
+        + "<h2>By month</h2>" + table(summary["months"], ["month", "days", "pomodoros", "pauses", "rating"])
+        + "<h2>By day</h2>" + table(summary["days"], ["date", "pomodoros", "pauses", "pause_minutes",
+                                                     "goal_completion", "rating"])
+        + "</body></html>"
+    )
+
+
+def write_synthetic_logs(log_dir, days, start=None, seed=0, pomodoros_per_day=10, pauses_per_day=3):
+    # A plausible archive of daily logs for benchmarks
+    rng = random.Random(seed)
+    start = start or datetime.date(2020, 1, 1)
+    reasons = ["Coffee", "Meeting", "Lunch", "Phone call", "Email, urgent", "Stretch"]
+    os.makedirs(log_dir, exist_ok=True)
+    for i in range(days):
+        date = start + datetime.timedelta(days=i)
+        moment = datetime.datetime.combine(date, datetime.time(8, 0))
+        goals = [f"Goal {n}" for n in range(1, 4)]
+
+        def stamp(minutes):
+            nonlocal moment
+            moment += datetime.timedelta(minutes=minutes)
+            return moment.strftime(TIMESTAMP_FORMAT)
+
+        with open(os.path.join(log_dir, f"focus_log_{date.isoformat()}.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(LOG_HEADER)
+            writer.writerow([stamp(0), "day_started", "Intention: Deep work", f"Goals: {', '.join(goals)}"])
+            pauses = rng.randint(0, pauses_per_day * 2)
+            for n in range(1, rng.randint(pomodoros_per_day // 2, pomodoros_per_day * 3 // 2) + 1):
+                writer.writerow([stamp(31), "pomodoro_completed", f"Pomodoro #{n}", ""])
+                if pauses and rng.random() < 0.4:
+                    pauses -= 1
+                    writer.writerow([stamp(2), "pause", "Timer paused", rng.choice(reasons)])
+                    writer.writerow([stamp(rng.randint(1, 20)), "resume", "Timer resumed", ""])
+            for goal in goals[:rng.randint(0, 3)]:
+                writer.writerow([stamp(5), "goal_completed", goal, "Done"])
+            writer.writerow([stamp(5), "end_of_day", f"Rating: {rng.randint(1, 10)}", "Synthetic day"])
+
+
+def add_report_arguments(parser):
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="json")
+    parser.add_argument("--out", help="write the report here instead of stdout")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="log files per worker task")
+
+
+def run_report_command(args, log_dir):
+    builder = ReportBuilder(log_dir, jobs=args.jobs, chunk_size=args.chunk_size)
+    summary = builder.build()
+    output = render_html(summary) if args.format == "html" else json.dumps(summary, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    stats = builder.stats
+    print(f"{stats['files_parsed']} files parsed, {stats['files_cached']} cached, "
+          f"{stats['rows_per_second']} rows/s", file=sys.stderr)
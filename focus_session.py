@@ -0,0 +1,101 @@
+from collections import deque, namedtuple
+
+RECENT_EVENTS = 256
+
+EventRecord = namedtuple("EventRecord", ["time", "event", "detail", "remarks"])
+
+
+class Goal:
+    __slots__ = ("text", "done", "remarks")
+
+    def __init__(self, text):
+        self.text = text
+        self.done = False
+        self.remarks = ""
+
+
+class SessionModel:
+    # A day's intention, goals and recent events. Goals are indexed by text,
+    # so completion checks are O(1) and "all done" is a counter rather than a
+    # scan. The last RECENT_EVENTS logged events are kept in a ring buffer
+    # for the expanded view, so it never has to reread the CSV.
+
+    __slots__ = ("daily_intention", "_goals", "_completed", "_pending", "recent")
+
+    def __init__(self, recent_capacity=RECENT_EVENTS):
+        self.daily_intention = ""
+        self._goals = {}      # text -> Goal, in the order they were added
+        self._completed = []  # texts in completion order
+        self._pending = 0
+        self.recent = deque(maxlen=recent_capacity)
+
+    def start_day(self, intention, goals):
+        self.daily_intention = intention
+        self._goals = {}
+        self._completed = []
+        self._pending = 0
+        for goal in goals:
+            self.add_goal(goal)
+
+    def reset_day(self):
+        self.start_day("", [])
+        self.recent.clear()
+
+    def add_goal(self, text):
+        # Returns False for a goal that is already on the list
+        if text in self._goals:
+            return False
+        self._goals[text] = Goal(text)
+        self._pending += 1
+        return True
+
+    def complete_goal(self, text, remarks=""):
+        # Returns False if it was already done. Goals that weren't on the list
+        # are added, as a logged goal_completed can name any goal.
+        goal = self._goals.get(text)
+        if goal is None:
+            self.add_goal(text)
+            goal = self._goals[text]
+        if goal.done:
+            return False
+        goal.done = True
+        goal.remarks = remarks or ""
+        self._completed.append(text)
+        self._pending -= 1
+        return True
+
+    def is_completed(self, text):
+        goal = self._goals.get(text)
+        return goal is not None and goal.done
+
+    def all_completed(self):
+        return bool(self._goals) and self._pending == 0
+
+    def goal_items(self):
+        # Goal records in the order they were added
+        return self._goals.values()
+
+    @property
+    def goals(self):
+        return list(self._goals)
+
+    @property
+    def completed_goals(self):
+        return list(self._completed)
+
+    def has_goals(self):
+        return bool(self._goals)
+
+    def record(self, time, event, detail, remarks):
+        self.recent.append(EventRecord(time, event, detail or "", remarks or ""))
+
+    def recent_events(self, n):
+        # Newest last
+        if n >= len(self.recent):
+            return list(self.recent)
+        return [self.recent[i] for i in range(len(self.recent) - n, len(self.recent))]
+
+    def restore(self, intention, goals, completed_goals):
+        self.start_day(intention, goals)
+        for goal in completed_goals:
+            self.complete_goal(goal)
@@ -0,0 +1,373 @@
+import datetime
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+from functools import partial
+
+
+class DeadlineTimer:
+    # Counts down against an absolute monotonic deadline instead of summing
+    # one-second sleeps, so jitter in the wakeups never accumulates. The
+    # thread only wakes when the displayed second changes or the interval
+    # ends; while paused or between intervals it blocks on the condition.
+
+    def __init__(self, on_tick, on_expire, clock=time.monotonic):
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.clock = clock
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._paused = False
+        self._deadline = None        # absolute end of the current interval
+        self._paused_remaining = None  # seconds left, kept while paused
+        self._last_deadline = None   # end of the interval that just expired
+        self._shown = None
+
+        self.wakeups = 0
+        self.started_at = None
+        self.drift = deque(maxlen=256)  # seconds late for each expired interval
+
+    def start(self, seconds):
+        with self._cond:
+            self._running = True
+            self._paused = False
+            self._arm(seconds)
+            if self._thread is None:
+                self.started_at = self.clock()
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+
+    def chain(self, seconds):
+        # Start the next interval from where the previous one was due to end,
+        # not from when the UI got around to handling it
+        with self._cond:
+            if self._paused:
+                self._paused_remaining = seconds
+            elif self._last_deadline is not None:
+                self._deadline = self._last_deadline + seconds
+                self._shown = None
+            else:
+                self._arm(seconds)
+            self._last_deadline = None
+            self._cond.notify()
+
+    def reset(self, seconds):
+        with self._cond:
+            self._last_deadline = None
+            if self._paused:
+                self._paused_remaining = seconds
+            else:
+                self._arm(seconds)
+            self._cond.notify()
+
+    def pause(self):
+        with self._cond:
+            if self._paused:
+                return
+            self._paused = True
+            if self._deadline is not None:
+                self._paused_remaining = max(0.0, self._deadline - self.clock())
+                self._deadline = None
+            self._cond.notify()
+
+    def resume(self):
+        with self._cond:
+            if not self._paused:
+                return
+            self._paused = False
+            if self._paused_remaining is not None:
+                # Shift the deadline by however long we were paused
+                self._arm(self._paused_remaining)
+                self._paused_remaining = None
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def remaining(self):
+        with self._cond:
+            if self._paused:
+                left = self._paused_remaining or 0.0
+            elif self._deadline is not None:
+                left = self._deadline - self.clock()
+            else:
+                left = 0.0
+        return max(0, math.ceil(left))
+
+    def until_change(self, step=1):
+        # Seconds until the remaining time next crosses a multiple of `step`
+        # seconds (step=1: the displayed second changes; the interval's end
+        # is always one), or None while paused or between intervals
+        with self._cond:
+            if self._paused or self._deadline is None:
+                return None
+            left = self._deadline - self.clock()
+        if left <= 0:
+            return 0.0
+        return left % step or step
+
+    def stats(self):
+        with self._cond:
+            elapsed = self.clock() - self.started_at if self.started_at is not None else 0.0
+            drift = list(self.drift)
+        return {
+            "wakeups": self.wakeups,
+            "wakeups_per_minute": self.wakeups * 60.0 / elapsed if elapsed > 0 else 0.0,
+            "intervals": len(drift),
+            "max_drift": max(drift) if drift else 0.0,
+            "mean_drift": sum(drift) / len(drift) if drift else 0.0,
+        }
+
+    def _arm(self, seconds):
+        self._deadline = self.clock() + seconds
+        self._shown = None
+
+    def _run(self):
+        while True:
+            callback = None
+            with self._cond:
+                if not self._running:
+                    return
+                if self._deadline is None:
+                    # Paused or waiting for the next interval to be chained
+                    self._cond.wait()
+                    self.wakeups += 1
+                    continue
+
+                left = self._deadline - self.clock()
+                if left <= 0:
+                    self.drift.append(-left)
+                    self._last_deadline = self._deadline
+                    self._deadline = None
+                    self._shown = 0
+                    callback = self.on_expire
+                else:
+                    shown = math.ceil(left)
+                    if shown != self._shown:
+                        self._shown = shown
+                        callback = partial(self.on_tick, shown)
+                    else:
+                        # Sleep until the displayed second changes
+                        self._cond.wait(left - (shown - 1))
+                        self.wakeups += 1
+
+            if callback is not None:
+                callback()
+
+
+WORK_INTERVALS = 3  # intervals 0, 1, 2 are thirds of a Pomodoro, 3 is the break
+CUE_INTERVAL = "interval"
+CUE_BREAK = "break"
+
+Transition = namedtuple("Transition", "at ended started cue pomodoro_completed duration")
+
+
+class PomodoroEngine:
+    # The interval state machine behind the timer window, free of Tk so it
+    # can be driven by a real or simulated clock. advance() is called once per
+    # interval boundary and returns what the view should do about it.
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.pomodoro_count = 0
+        self.current_interval = 0
+        self.total_pomodoros_completed = 0
+        self.original_pomodoro_time = 0
+        self.pomodoro_time = 0
+        self.break_time = 0
+        self.time_remaining = 0
+
+    def configure(self, pomodoro_seconds):
+        self.original_pomodoro_time = pomodoro_seconds
+        self.pomodoro_time = self.original_pomodoro_time
+        self.break_time = max(6 * 60, int(self.pomodoro_time * 0.2))  # 6 minutes or 20% of pomodoro time
+        self.time_remaining = self.pomodoro_time // 3  # First interval is 1/3 of pomodoro time
+
+    SNAPSHOT_FIELDS = ("pomodoro_count", "current_interval", "total_pomodoros_completed",
+                       "original_pomodoro_time", "pomodoro_time", "break_time")
+
+    def snapshot(self):
+        return {field: getattr(self, field) for field in self.SNAPSHOT_FIELDS}
+
+    def restore(self, snapshot, time_remaining):
+        for field in self.SNAPSHOT_FIELDS:
+            setattr(self, field, snapshot[field])
+        self.time_remaining = time_remaining
+
+    def reset_day(self):
+        self.pomodoro_count = 0
+        self.current_interval = 0
+        self.total_pomodoros_completed = 0
+
+    def is_work(self):
+        return self.current_interval < WORK_INTERVALS
+
+    def advance(self):
+        ended = self.current_interval
+        cue = CUE_INTERVAL if ended < WORK_INTERVALS else CUE_BREAK
+
+        # Move to next interval
+        self.current_interval = (self.current_interval + 1) % 4
+
+        completed = None
+        if self.current_interval == 0:
+            self.pomodoro_count += 1
+            self.total_pomodoros_completed += 1
+            completed = self.total_pomodoros_completed
+
+            # Adaptive pomodoro timing
+            if self.pomodoro_count % 4 == 0:
+                # After every 4 pomodoros, adjust time
+                if self.pomodoro_count <= 4:
+                    self.pomodoro_time = self.original_pomodoro_time
+                elif self.pomodoro_count <= 8:
+                    self.pomodoro_time = int(self.original_pomodoro_time * 0.9)  # 10% reduction
+                else:
+                    self.pomodoro_time = int(self.original_pomodoro_time * 0.8)  # 20% reduction
+
+        # Set new time remaining
+        if self.current_interval < WORK_INTERVALS:  # Work interval (1/3 of pomodoro)
+            self.time_remaining = self.pomodoro_time // 3
+        else:  # Break
+            self.time_remaining = self.break_time
+
+        return Transition(self.clock(), ended, self.current_interval, cue, completed, self.time_remaining)
+
+
+class DaySchedule:
+    # The rest of the day's interval boundaries, worked out up front by
+    # stepping a copy of the engine, so questions like "when does Pomodoro #7
+    # end" are a bisect over three parallel arrays rather than a simulation.
+    # A pause or a late start shifts everything after it, so every plan()
+    # starts over from the engine's current interval; only intervals the
+    # engine is actually about to run are in the table.
+
+    def __init__(self):
+        self.ends = array('d')       # wall-clock end of each interval
+        self.intervals = array('b')  # engine.current_interval while it runs
+        self.completed = array('I')  # Pomodoros completed once it has ended
+        self.completed_before = None  # Pomodoros completed when the plan starts
+        self.until = None
+
+        self.plans = 0
+        self.entries_computed = 0
+        self.last_plan_us = 0.0
+
+    def plan(self, engine, interval_ends_at, until=None):
+        # interval_ends_at is when the engine's current interval ends
+        start = time.perf_counter()
+        if until is None:
+            day = datetime.date.fromtimestamp(interval_ends_at) + datetime.timedelta(days=1)
+            until = datetime.datetime.combine(day, datetime.time()).timestamp()
+        self.until = until
+
+        self.clear()
+        self.completed_before = engine.total_pomodoros_completed
+
+        stepper = PomodoroEngine(lambda: 0)
+        stepper.restore(engine.snapshot(), engine.time_remaining)
+        end = interval_ends_at
+        while end <= until:
+            interval = stepper.current_interval
+            stepper.advance()
+            self.ends.append(end)
+            self.intervals.append(interval)
+            self.completed.append(stepper.total_pomodoros_completed)
+            self.entries_computed += 1
+            if stepper.time_remaining <= 0:
+                break  # Not configured yet; the day has no length to plan
+            end += stepper.time_remaining
+
+        self.plans += 1
+        self.last_plan_us = (time.perf_counter() - start) * 1e6
+
+    def clear(self):
+        del self.ends[:]
+        del self.intervals[:]
+        del self.completed[:]
+        self.completed_before = None
+
+    # Forecasts; all O(log n)
+
+    def current(self, at):
+        # (interval, seconds left) for the interval running at wall time `at`
+        i = bisect_right(self.ends, at)
+        if i == len(self.ends):
+            return None
+        return self.intervals[i], self.ends[i] - at
+
+    def pomodoro_end(self, n):
+        # When Pomodoro #n (counted over the whole day) is completed
+        i = bisect_left(self.completed, n)
+        if i == len(self.completed):
+            return None
+        return self.ends[i]
+
+    def pomodoros_by(self, at):
+        # Pomodoros completed for the day by wall time `at`, from the planned
+        # interval's start on
+        i = bisect_right(self.ends, at)
+        return self.completed[i - 1] if i else self.completed_before
+
+    def stats(self):
+        return {
+            "entries": len(self.ends),
+            "bytes": sum(a.itemsize * len(a) for a in (self.ends, self.intervals, self.completed)),
+            "plans": self.plans,
+            "entries_computed": self.entries_computed,
+            "last_plan_us": round(self.last_plan_us, 1),
+        }
+
+
+class SimulatedClock:
+    # Manually advanced stand-in for time.monotonic/time.time
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def catch_up(engine, interval_ends_at, now):
+    # Advance the engine past every interval that ended by wall time `now`,
+    # e.g. while the app was closed. Returns [(ended at, transition)] and the
+    # end of the interval that is running at `now`.
+    missed = []
+    while interval_ends_at <= now:
+        transition = engine.advance()
+        missed.append((interval_ends_at, transition))
+        if engine.time_remaining <= 0:
+            break  # Not configured; nothing left to step through
+        interval_ends_at += engine.time_remaining
+    return missed, interval_ends_at
+
+
+def simulate_day(engine, clock, hours=12, on_transition=None):
+    # Step the engine through a working day without waiting for real time
+    end = clock() + hours * 3600
+    transitions = 0
+    while clock() + engine.time_remaining <= end:
+        clock.advance(engine.time_remaining)
+        transition = engine.advance()
+        transitions += 1
+        if on_transition is not None:
+            on_transition(transition)
+        if engine.time_remaining <= 0:
+            break  # Not configured; time would never move
+    return transitions
@@ -0,0 +1,376 @@
+import threading
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+from focus_metrics import latency_summary
+
+RECENT_SHOWN = 5
+
+
+class ExpandedView:
+    # Retained-mode version of the expanded panel. Widgets are created once
+    # and kept per goal; render() compares the new state with what is on
+    # screen and only creates, destroys or reconfigures what changed.
+
+    def __init__(self, parent, on_goal_checked, on_add_goal):
+        self.parent = parent
+        self.on_goal_checked = on_goal_checked
+        self.on_add_goal = on_add_goal
+
+        self._built = False
+        self._goal_rows = {}        # index in goals -> (frame, checkbutton, var, text)
+        self._completed_labels = []  # labels in completed_goals order
+        self._recent_labels = []     # newest event last
+        self._intention = None
+        self._status = None
+
+        self.renders = 0
+        self.created = 0
+        self.destroyed = 0
+        self.reconfigured = 0
+        self.last_render_ms = 0.0
+
+    def _build(self):
+        # Daily intention display
+        self.intention_frame = ttk.Frame(self.parent)
+        self.intention_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(self.intention_frame, text="Daily Intention:", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
+        self.intention_label = ttk.Label(self.intention_frame, text="", font=("Arial", 10))
+        self.intention_label.pack(side=tk.LEFT, padx=5)
+
+        # Goals display with checkboxes
+        self.goals_frame = ttk.Frame(self.parent)
+        self.goals_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(self.goals_frame, text="Goals:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
+
+        # Completed goals, packed only once there are some
+        self.completed_frame = ttk.Frame(self.parent)
+        ttk.Label(self.completed_frame, text="Completed:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
+
+        # Recent events, packed only once there are some
+        self.recent_frame = ttk.Frame(self.parent)
+        ttk.Label(self.recent_frame, text="Recent:", font=("Arial", 10, "bold")).pack(anchor=tk.W, padx=5)
+
+        # Status display
+        self.status_frame = ttk.Frame(self.parent)
+        self.status_frame.pack(fill=tk.X, pady=5)
+        self.status_label = ttk.Label(self.status_frame, text="")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+
+        # Add goal button (if all goals are completed)
+        self.add_goal_button = ttk.Button(self.parent, text="Add New Goal", command=self.on_add_goal)
+
+        self.created += 12
+        self._built = True
+
+    def render(self, session, pomodoros_completed, forecast=""):
+        # session is a focus_session.SessionModel
+        start = time.perf_counter()
+        if not self._built:
+            self._build()
+
+        intention = session.daily_intention
+        completed_goals = session.completed_goals
+
+        if intention != self._intention:
+            self.intention_label.config(text=intention)
+            self._intention = intention
+            self.reconfigured += 1
+
+        # Pending goals: keep rows that are still pending, drop completed ones,
+        # add rows for new goals (goals are only ever appended)
+        pending = {i: goal.text for i, goal in enumerate(session.goal_items()) if not goal.done}
+        for index in list(self._goal_rows):
+            row = self._goal_rows[index]
+            if pending.get(index) != row[3]:
+                row[0].destroy()
+                del self._goal_rows[index]
+                self.destroyed += 1
+        for index, goal in pending.items():
+            if index not in self._goal_rows:
+                self._goal_rows[index] = self._goal_row(goal)
+
+        # Completed goals (strikethrough)
+        self._sync_labels(self._completed_labels, self.completed_frame,
+                          [f"✓ {goal}" for goal in completed_goals], foreground="green")
+        self._set_visible(self.completed_frame, bool(completed_goals),
+                          fill=tk.X, pady=5, before=self.status_frame)
+
+        self._render_recent(session)
+
+        status = f"Pomodoros completed: {pomodoros_completed}"
+        if forecast:
+            status += f"  ·  {forecast}"
+        if status != self._status:
+            self.status_label.config(text=status)
+            self._status = status
+            self.reconfigured += 1
+
+        self._set_visible(self.add_goal_button, session.all_completed(), pady=10)
+
+        self.renders += 1
+        self.last_render_ms = (time.perf_counter() - start) * 1000
+
+    def render_recent(self, session):
+        # Just the recent events rows, for a newly logged event
+        if self._built:
+            self._render_recent(session)
+
+    def _render_recent(self, session):
+        # The last few logged events, straight from the session's ring buffer
+        recent = session.recent_events(RECENT_SHOWN)
+        self._sync_labels(self._recent_labels, self.recent_frame,
+                          [f"{record.time[11:16]} {record.event} {record.detail}".rstrip()
+                           for record in recent])
+        self._set_visible(self.recent_frame, bool(recent), fill=tk.X, pady=5, after=self.status_frame)
+
+    def _sync_labels(self, labels, frame, texts, **options):
+        # Reuse the existing labels in order, adding or removing at the end
+        for position, text in enumerate(texts):
+            if position < len(labels):
+                if labels[position].cget("text") != text:
+                    labels[position].config(text=text)
+                    self.reconfigured += 1
+            else:
+                label = ttk.Label(frame, text=text, **options)
+                label.pack(anchor=tk.W, padx=15)
+                labels.append(label)
+                self.created += 1
+        while len(labels) > len(texts):
+            labels.pop().destroy()
+            self.destroyed += 1
+
+    def _goal_row(self, goal):
+        goal_frame = ttk.Frame(self.goals_frame)
+        goal_frame.pack(fill=tk.X, pady=2)
+
+        var = tk.BooleanVar(value=False)
+        cb = ttk.Checkbutton(goal_frame, text=goal, variable=var,
+                             command=lambda g=goal, v=var: self.on_goal_checked(g, v))
+        cb.pack(side=tk.LEFT, padx=5)
+        self.created += 2
+        return goal_frame, cb, var, goal
+
+    def _set_visible(self, widget, visible, **pack_options):
+        if visible and not widget.winfo_manager():
+            widget.pack(**pack_options)
+            self.reconfigured += 1
+        elif not visible and widget.winfo_manager():
+            widget.pack_forget()
+            self.reconfigured += 1
+
+    def stats(self):
+        return {
+            "renders": self.renders,
+            "widgets_created": self.created,
+            "widgets_destroyed": self.destroyed,
+            "reconfigured": self.reconfigured,
+            "goal_rows": len(self._goal_rows),
+            "last_render_ms": round(self.last_render_ms, 3),
+        }
+
+
+class UpdateChannel:
+    # Hands updates from worker threads to Tk. The latest state replaces any
+    # state that hasn't been drawn yet, while events (interval ends) queue and
+    # are delivered exactly once. Tk drains both from one repeating after()
+    # poll, so worker threads never schedule Tk callbacks themselves. While
+    # active (the timer is counting down) the poll is timed by next_due(),
+    # the seconds until a worker next posts, so Tk wakes just after each post
+    # rather than on a fixed beat; a post that hasn't landed yet is retried
+    # every poll_ms. Otherwise it wakes Tk once every idle_poll_ms.
+
+    SLACK_MS = 15  # past next_due(), so the post is usually already there
+
+    def __init__(self, root, on_state, poll_ms=50, idle_poll_ms=1000, next_due=None):
+        self.root = root
+        self.on_state = on_state
+        self.poll_ms = poll_ms
+        self.idle_poll_ms = idle_poll_ms
+        self.next_due = next_due
+        self.active = False
+
+        self._lock = threading.Lock()
+        self._state = None
+        self._state_posted = None
+        self._has_state = False
+        self._events = deque()
+        self._after_id = None
+
+        self.polls = 0
+        self.states_posted = 0
+        self.states_coalesced = 0
+        self.events_delivered = 0
+        self.max_depth = 0
+        self.state_latency = deque(maxlen=512)  # seconds from post to delivery
+        self.event_latency = deque(maxlen=512)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self._interval(), self._poll)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def set_active(self, active):
+        # Call from the Tk thread
+        if active == self.active:
+            return
+        self.active = active
+        self.reschedule()
+
+    def reschedule(self):
+        # next_due() changed (e.g. the window was restored): don't sit out the
+        # rest of a long wait
+        if self._after_id is not None:
+            self.stop()
+            # Pick up whatever was posted meanwhile right away
+            self._after_id = self.root.after(min(self.poll_ms, self._interval()), self._poll)
+
+    def _interval(self, settled=True):
+        if not self.active:
+            return self.idle_poll_ms
+        due = self.next_due() if self.next_due is not None else None
+        if due is None:
+            return self.poll_ms
+        wait = int(due * 1000) + self.SLACK_MS
+        if not settled:
+            # The post that was due may still be on its way, or an event
+            # handler just restarted the countdown
+            wait = min(wait, self.poll_ms)
+        return max(1, wait)
+
+    def post_state(self, state):
+        with self._lock:
+            if self._has_state:
+                self.states_coalesced += 1
+            else:
+                self._state_posted = time.perf_counter()
+            self._state = state
+            self._has_state = True
+            self.states_posted += 1
+
+    def post_event(self, callback, *args):
+        with self._lock:
+            self._events.append((time.perf_counter(), callback, args))
+            self.max_depth = max(self.max_depth, len(self._events))
+
+    def drain(self):
+        # Returns how many updates were delivered
+        with self._lock:
+            has_state, state, posted = self._has_state, self._state, self._state_posted
+            self._has_state = False
+            self._state = None
+            events = list(self._events)
+            self._events.clear()
+
+        now = time.perf_counter()
+        # State first: an event handler may replace it (e.g. a new interval's length)
+        if has_state:
+            self.state_latency.append(now - posted)
+            self.on_state(state)
+        for posted, callback, args in events:
+            self.event_latency.append(time.perf_counter() - posted)
+            self.events_delivered += 1
+            callback(*args)
+        return len(events) + (1 if has_state else 0)
+
+    def _poll(self):
+        self.polls += 1
+        events = self.events_delivered
+        delivered = 0
+        try:
+            delivered = self.drain()
+        finally:
+            settled = delivered > 0 and self.events_delivered == events
+            self._after_id = self.root.after(self._interval(settled), self._poll)
+
+    def stats(self):
+        with self._lock:
+            depth = len(self._events) + (1 if self._has_state else 0)
+        return {
+            "depth": depth,
+            "max_event_depth": self.max_depth,
+            "polls": self.polls,
+            "states_posted": self.states_posted,
+            "states_coalesced": self.states_coalesced,
+            "events_delivered": self.events_delivered,
+            "state_latency_ms": latency_summary(self.state_latency),
+            "event_latency_ms": latency_summary(self.event_latency),
+        }
+
+
+class TimerDisplay:
+    # Pushes the countdown to the timer label and window title, skipping
+    # redundant work: unchanged text is never re-sent, the label isn't touched
+    # while the window is unmapped, and while iconified the title switches to
+    # a coarse text that only changes once a minute. <Map> restores full rate.
+
+    def __init__(self, root, label):
+        self.root = root
+        self.label = label
+        self.mapped = True
+
+        self._label_text = None  # what is on screen
+        self._title_text = None
+        self._wanted = None      # latest (label, title, coarse title)
+
+        self.label_updates = 0
+        self.label_skipped_unchanged = 0
+        self.label_skipped_hidden = 0
+        self.title_updates = 0
+        self.title_skipped = 0
+
+        root.bind("<Map>", self._on_map, add="+")
+        root.bind("<Unmap>", self._on_unmap, add="+")
+
+    def show(self, label_text, title_text, coarse_title_text):
+        self._wanted = (label_text, title_text, coarse_title_text)
+
+        if not self.mapped:
+            self.label_skipped_hidden += 1
+        elif label_text == self._label_text:
+            self.label_skipped_unchanged += 1
+        else:
+            self.label.config(text=label_text)
+            self._label_text = label_text
+            self.label_updates += 1
+
+        # Minimized windows still show their title in the task bar
+        title = title_text if self.mapped else coarse_title_text
+        if title == self._title_text:
+            self.title_skipped += 1
+        else:
+            self.root.title(title)
+            self._title_text = title
+            self.title_updates += 1
+
+    def _on_map(self, event):
+        # Child widgets share the toplevel's bindings; only react to the window itself
+        if event.widget is not self.root or self.mapped:
+            return
+        self.mapped = True
+        if self._wanted is not None:
+            self.show(*self._wanted)
+
+    def _on_unmap(self, event):
+        if event.widget is not self.root:
+            return
+        self.mapped = False
+        if self._wanted is not None:
+            self.show(*self._wanted)
+
+    def stats(self):
+        return {
+            "mapped": self.mapped,
+            "label_updates": self.label_updates,
+            "label_skipped_unchanged": self.label_skipped_unchanged,
+            "label_skipped_hidden": self.label_skipped_hidden,
+            "title_updates": self.title_updates,
+            "title_skipped": self.title_skipped,
+            "redraws_avoided": self.label_skipped_unchanged + self.label_skipped_hidden + self.title_skipped,
+        }
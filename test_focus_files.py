@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from focus_files import write_atomic
+
+
+def test_write_atomic_replaces_the_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("old")
+    write_atomic(str(path), "new ✓")
+    assert path.read_bytes() == "new ✓".encode("utf-8")
+    write_atomic(str(path), b"\x00bytes", fsync=True)
+    assert path.read_bytes() == b"\x00bytes"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_failed_write_keeps_the_old_file_and_no_temp(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("old")
+    with pytest.raises(TypeError):
+        write_atomic(str(path), 42)
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["state.json"]
@@ -0,0 +1,67 @@
+import datetime
+
+from focus_history import HistoryIndex, iter_records
+from focus_log import append_rows
+
+TODAY = datetime.date(2024, 3, 4)
+
+
+def log_path(log_dir, date):
+    return log_dir / f"focus_log_{date}.csv"
+
+
+def test_refresh_reads_only_appended_rows(tmp_path):
+    path = log_path(tmp_path, "2024-03-04")
+    append_rows(str(path), [
+        ["2024-03-04 09:00:00", "pomodoro_completed", "Pomodoro #1", ""],
+        ["2024-03-04 09:10:00", "pause", "Timer paused", "Coffee"],
+    ])
+    index = HistoryIndex(str(tmp_path))
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    append_rows(str(path), [
+        ["2024-03-04 10:00:00", "pomodoro_completed", "Pomodoro #2", ""],
+        ["2024-03-04 18:00:00", "end_of_day", "Rating: 8", ""],
+    ])
+    assert index.refresh() == 2
+    assert index.pomodoros_per_day(1, today=TODAY) == [("2024-03-04", 2)]
+    assert index.top_pause_reasons() == [("coffee", 1)]
+    assert index.average_rating_by_weekday()[0] == ("Mon", 8.0)
+    assert index.events("2024-03-04", "pomodoro_completed")[1][2] == "Pomodoro #2"
+
+    # The saved index picks up where this one left off
+    reloaded = HistoryIndex(str(tmp_path))
+    assert reloaded.refresh() == 0
+    assert reloaded.event_counts() == index.event_counts()
+
+
+def test_rewritten_and_removed_files_are_rescanned(tmp_path):
+    path = log_path(tmp_path, "2024-03-04")
+    append_rows(str(path), [["2024-03-04 09:00:00", "pomodoro_completed", "Pomodoro #1", ""]] * 3)
+    index = HistoryIndex(str(tmp_path))
+    index.refresh()
+
+    path.unlink()
+    append_rows(str(path), [["2024-03-04 09:00:00", "pomodoro_completed", "Pomodoro #1", ""]])
+    index.refresh()
+    assert index.event_counts() == {"pomodoro_completed": 1}
+
+    path.unlink()
+    index.refresh()
+    assert index.event_counts() == {}
+
+
+def test_a_row_cut_off_mid_write_is_read_once_complete(tmp_path):
+    path = log_path(tmp_path, "2024-03-04")
+    append_rows(str(path), [["2024-03-04 09:00:00", "pomodoro_completed", "Pomodoro #1", ""]])
+    with open(path, 'a', newline='') as f:
+        f.write('2024-03-04 09:10:00,pause,Timer paused,"two\nlines')
+    assert [row[1] for _, _, row in iter_records(str(path))] == ["Event", "pomodoro_completed"]
+
+    index = HistoryIndex(str(tmp_path))
+    assert index.refresh() == 1
+    with open(path, 'a', newline='') as f:
+        f.write('"\r\n')
+    assert index.refresh() == 1
+    assert index.top_pause_reasons() == [("two\nlines", 1)]
@@ -0,0 +1,93 @@
+import pytest
+
+from focus_journal import (JournalReader, JournalWriter, csv_to_journal, journal_to_csv,
+                           RECORD, RECORDS_SUFFIX, STRINGS_SUFFIX)
+from focus_log import append_rows
+
+DAY_ONE = [
+    ["2024-03-01 09:00:00", "day_started", "Intention: Focus", "Goals: A, B"],
+    ["2024-03-01 09:30:00", "pause", "Timer paused", "Lunch, \"quoted\""],
+    ["2024-03-01 10:00:00", "custom_event", "détail", "multi\nline"],
+]
+DAY_TWO = [
+    ["2024-03-02 09:00:00", "pomodoro_completed", "Pomodoro #1", ""],
+    ["not a timestamp", "resume", "Timer resumed", ""],
+]
+
+
+def write_logs(log_dir):
+    append_rows(str(log_dir / "focus_log_2024-03-01.csv"), DAY_ONE)
+    append_rows(str(log_dir / "focus_log_2024-03-02.csv"), DAY_TWO)
+
+
+def test_write_read_round_trip(tmp_path):
+    base = str(tmp_path / "journal")
+    writer = JournalWriter(base)
+    for row in DAY_ONE:
+        writer.append_row(row)
+    writer.append_row(DAY_TWO[1], "2024-03-02")
+    writer.close()
+
+    with JournalReader(base) as reader:
+        rows = list(reader.rows())
+    assert rows == [("2024-03-01", row) for row in DAY_ONE] + [("2024-03-02", DAY_TWO[1])]
+
+
+def test_reopening_appends_and_reuses_strings(tmp_path):
+    base = str(tmp_path / "journal")
+    for _ in range(2):
+        writer = JournalWriter(base)
+        writer.append_row(DAY_ONE[1])
+        writer.close()
+    strings_size = (tmp_path / ("journal" + STRINGS_SUFFIX)).stat().st_size
+
+    writer = JournalWriter(base)
+    writer.append_row(DAY_ONE[1])
+    writer.close()
+    assert (tmp_path / ("journal" + STRINGS_SUFFIX)).stat().st_size == strings_size
+    with JournalReader(base) as reader:
+        assert reader.count == 3
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    base = str(tmp_path / "journal")
+    writer = JournalWriter(base)
+    writer.append_row(DAY_ONE[0])
+    writer.close()
+    with open(base + RECORDS_SUFFIX, 'ab') as f:
+        f.write(b"\x01" * (RECORD.size // 2))
+    with open(base + STRINGS_SUFFIX, 'ab') as f:
+        f.write(b"\x20\x00\x00\x00torn")
+
+    writer = JournalWriter(base)
+    writer.append_row(DAY_ONE[1])
+    writer.close()
+    with JournalReader(base) as reader:
+        assert [row for _, row in reader.rows()] == DAY_ONE[:2]
+
+
+def test_csv_round_trip_is_byte_for_byte(tmp_path):
+    log_dir = tmp_path / "logs"
+    write_logs(log_dir)
+    base = str(tmp_path / "journal")
+    assert csv_to_journal(str(log_dir), base) == len(DAY_ONE) + len(DAY_TWO)
+    # Importing again rebuilds rather than appends
+    assert csv_to_journal(str(log_dir), base) == len(DAY_ONE) + len(DAY_TWO)
+
+    out_dir = tmp_path / "out"
+    assert journal_to_csv(base, str(out_dir)) == 2
+    for name in ("focus_log_2024-03-01.csv", "focus_log_2024-03-02.csv"):
+        assert (out_dir / name).read_bytes() == (log_dir / name).read_bytes()
+
+
+def test_export_refuses_existing_logs_without_force(tmp_path):
+    log_dir = tmp_path / "logs"
+    write_logs(log_dir)
+    base = str(tmp_path / "journal")
+    csv_to_journal(str(log_dir), base)
+    before = (log_dir / "focus_log_2024-03-01.csv").read_bytes()
+
+    with pytest.raises(FileExistsError):
+        journal_to_csv(base, str(log_dir))
+    assert journal_to_csv(base, str(log_dir), force=True) == 2
+    assert (log_dir / "focus_log_2024-03-01.csv").read_bytes() == before
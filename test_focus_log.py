@@ -0,0 +1,71 @@
+import csv
+import io
+
+from focus_log import LOG_HEADER, LogWriter, FLUSH_EVERY_EVENT, FLUSH_ON_SHUTDOWN, append_rows
+from focus_metrics import Metrics
+
+ROWS = [
+    ["2024-03-01 09:00:00", "pomodoro_completed", "Pomodoro #1", ""],
+    ["2024-03-01 09:30:00", "pause", "Timer paused", 'Lunch, then "errands"'],
+    ["2024-03-01 10:00:00", "goal_completed", "Write report", "multi\nline remarks"],
+    ["2024-03-01 10:05:00", "resume", "Timer resumed", "ünïcode"],
+]
+FIRST_ROWS = [["2024-03-01 08:59:00", "day_started", "Intention: Focus", "Goals: A, B"]]
+
+
+def expected_csv(rows):
+    # What the app wrote before the background writer: csv.writer on a fresh file
+    out = io.StringIO(newline='')
+    writer = csv.writer(out)
+    writer.writerow(LOG_HEADER)
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def test_log_writer_output_matches_csv_writer(tmp_path):
+    writer = LogWriter(str(tmp_path), flush_policy=FLUSH_ON_SHUTDOWN, max_batch=2)
+    writer.open_day("2024-03-01", FIRST_ROWS)
+    for row in ROWS:
+        writer.write(row)
+    assert writer.close()
+
+    data = (tmp_path / "focus_log_2024-03-01.csv").read_bytes()
+    assert data == expected_csv(FIRST_ROWS + ROWS)
+    assert writer.stats()["rows_written"] == len(ROWS)
+
+
+def test_open_day_only_adds_first_rows_to_a_new_file(tmp_path):
+    for _ in range(2):
+        writer = LogWriter(str(tmp_path))
+        writer.open_day("2024-03-01", FIRST_ROWS)
+        writer.write(ROWS[0])
+        writer.close()
+
+    data = (tmp_path / "focus_log_2024-03-01.csv").read_bytes()
+    assert data == expected_csv(FIRST_ROWS + [ROWS[0], ROWS[0]])
+
+
+def test_rows_go_to_the_file_of_their_own_day(tmp_path):
+    writer = LogWriter(str(tmp_path))
+    writer.write(ROWS[0])
+    writer.write(["2024-03-02 00:00:01", "pause", "Timer paused", ""])
+    writer.close()
+    assert (tmp_path / "focus_log_2024-03-01.csv").read_bytes() == expected_csv([ROWS[0]])
+    assert (tmp_path / "focus_log_2024-03-02.csv").exists()
+
+
+def test_append_rows_matches_log_writer(tmp_path):
+    path = tmp_path / "profile" / "focus_log_2024-03-01.csv"
+    append_rows(str(path), ROWS[:2])
+    append_rows(str(path), ROWS[2:])
+    assert path.read_bytes() == expected_csv(ROWS)
+
+
+def test_write_and_flush_are_timed_on_the_writer_thread(tmp_path):
+    metrics = Metrics(str(tmp_path / "metrics"))
+    writer = LogWriter(str(tmp_path), flush_policy=FLUSH_EVERY_EVENT, metrics=metrics)
+    for row in ROWS:
+        writer.write(row)
+    writer.close()
+    assert metrics.histograms["log_write"].count >= 1
+    assert metrics.histograms["log_flush"].count == writer.flushes
@@ -0,0 +1,52 @@
+from focus_session import SessionModel
+
+
+def test_goal_status_and_all_completed():
+    session = SessionModel()
+    session.start_day("Ship it", ["Write", "Review"])
+    assert session.has_goals() and not session.all_completed()
+
+    assert session.complete_goal("Write", "done")
+    assert not session.complete_goal("Write")  # already done
+    assert session.is_completed("Write") and not session.is_completed("Review")
+    assert not session.all_completed()
+
+    session.complete_goal("Review")
+    assert session.all_completed()
+    assert session.completed_goals == ["Write", "Review"]
+
+    assert session.add_goal("Deploy")
+    assert not session.add_goal("Deploy")
+    assert not session.all_completed()
+    assert [goal.text for goal in session.goal_items()] == ["Write", "Review", "Deploy"]
+
+
+def test_completing_an_unlisted_goal_adds_it():
+    session = SessionModel()
+    session.start_day("", ["A"])
+    session.complete_goal("B")
+    assert session.goals == ["A", "B"]
+    assert session.completed_goals == ["B"]
+
+
+def test_restore_matches_a_checkpoint():
+    session = SessionModel()
+    session.restore("Focus", ["A", "B", "C"], ["B"])
+    assert session.daily_intention == "Focus"
+    assert session.goals == ["A", "B", "C"]
+    assert session.completed_goals == ["B"]
+    assert not session.all_completed()
+
+
+def test_recent_events_ring_buffer_keeps_the_newest():
+    session = SessionModel(recent_capacity=4)
+    assert session.recent_events(5) == []
+    for i in range(10):
+        session.record(f"2024-01-01 10:{i:02d}:00", "pause", f"#{i}", None)
+
+    assert [record.detail for record in session.recent_events(3)] == ["#7", "#8", "#9"]
+    assert [record.detail for record in session.recent_events(10)] == ["#6", "#7", "#8", "#9"]
+    assert session.recent_events(1)[0].remarks == ""
+
+    session.reset_day()
+    assert session.recent_events(5) == [] and not session.has_goals()
@@ -0,0 +1,174 @@
+from focus_timer import PomodoroEngine, DaySchedule, CUE_INTERVAL, CUE_BREAK, catch_up
+
+POMODORO = 25 * 60
+THIRD = POMODORO // 3
+BREAK = 6 * 60
+CYCLE = 3 * THIRD + BREAK  # one Pomodoro and its break
+DAY = 12 * 3600
+
+
+def configured_engine():
+    engine = PomodoroEngine(lambda: 0)
+    engine.configure(POMODORO)
+    return engine
+
+
+class LegacyHandler:
+    # The interval bookkeeping the Tk app's handle_interval_end did before
+    # the engine was extracted, kept as the reference
+
+    def __init__(self, pomodoro_seconds):
+        self.current_interval = 0
+        self.pomodoro_count = 0
+        self.total_pomodoros_completed = 0
+        self.original_pomodoro_time = pomodoro_seconds
+        self.pomodoro_time = pomodoro_seconds
+        self.break_time = max(6 * 60, int(pomodoro_seconds * 0.2))
+        self.time_remaining = pomodoro_seconds // 3
+
+    def handle_interval_end(self):
+        cue = CUE_INTERVAL if self.current_interval < 3 else CUE_BREAK
+        completed = None
+        self.current_interval = (self.current_interval + 1) % 4
+        if self.current_interval == 0:
+            self.pomodoro_count += 1
+            self.total_pomodoros_completed += 1
+            completed = self.total_pomodoros_completed
+            if self.pomodoro_count % 4 == 0:
+                if self.pomodoro_count <= 4:
+                    self.pomodoro_time = self.original_pomodoro_time
+                elif self.pomodoro_count <= 8:
+                    self.pomodoro_time = int(self.original_pomodoro_time * 0.9)
+                else:
+                    self.pomodoro_time = int(self.original_pomodoro_time * 0.8)
+        if self.current_interval < 3:
+            self.time_remaining = self.pomodoro_time // 3
+        else:
+            self.time_remaining = self.break_time
+        return cue, completed, self.current_interval, self.time_remaining
+
+
+def test_advance_matches_the_old_interval_handler():
+    for minutes in (25, 50, 7):
+        engine = PomodoroEngine(lambda: 0)
+        engine.configure(minutes * 60)
+        legacy = LegacyHandler(minutes * 60)
+        assert engine.time_remaining == legacy.time_remaining
+        # 16 Pomodoros, through both adaptive reductions
+        for _ in range(16 * 4):
+            transition = engine.advance()
+            assert (transition.cue, transition.pomodoro_completed, transition.started,
+                    transition.duration) == legacy.handle_interval_end()
+
+
+def test_adaptive_lengths_and_breaks():
+    engine = configured_engine()
+    lengths = {}
+    for _ in range(16 * 4):
+        transition = engine.advance()
+        if transition.started == 0:
+            lengths[transition.pomodoro_completed] = engine.time_remaining
+        elif transition.started == 3:
+            assert transition.duration == BREAK
+    assert lengths[1] == lengths[7] == THIRD
+    assert lengths[8] == lengths[11] == int(POMODORO * 0.9) // 3
+    assert lengths[12] == lengths[16] == int(POMODORO * 0.8) // 3
+
+
+def test_snapshot_restore_round_trip():
+    engine = configured_engine()
+    for _ in range(9):
+        engine.advance()
+    copy = PomodoroEngine(lambda: 0)
+    copy.restore(engine.snapshot(), 42)
+    assert copy.snapshot() == engine.snapshot()
+    assert copy.time_remaining == 42
+    assert copy.advance()[1:] == engine.advance()[1:]
+
+
+def test_catch_up_steps_through_intervals_that_ended():
+    engine = configured_engine()
+    now = 10000.0
+    missed, ends_at = catch_up(engine, now - 2 * CYCLE - 10, now)
+
+    assert [t.pomodoro_completed for _, t in missed if t.pomodoro_completed] == [1, 2]
+    assert len(missed) == 9
+    assert missed[0][0] == now - 2 * CYCLE - 10
+    assert ends_at - now == THIRD - 10
+    assert engine.current_interval == 1
+
+
+def test_catch_up_leaves_a_running_interval_alone():
+    engine = configured_engine()
+    missed, ends_at = catch_up(engine, 500.0, 100.0)
+    assert missed == [] and ends_at == 500.0
+    assert engine.current_interval == 0
+
+
+def test_catch_up_stops_for_an_unconfigured_engine():
+    missed, _ = catch_up(PomodoroEngine(lambda: 0), 0.0, 100.0)
+    assert len(missed) == 1
+
+
+def test_plan_forecasts_each_pomodoro_from_the_current_interval():
+    engine = configured_engine()
+    schedule = DaySchedule()
+    schedule.plan(engine, 1000 + THIRD, until=1000 + DAY)
+
+    assert schedule.pomodoro_end(1) == 1000 + CYCLE
+    assert schedule.pomodoro_end(2) == 1000 + 2 * CYCLE
+    assert schedule.current(1000 + THIRD + 1) == (1, THIRD - 1)
+    assert list(schedule.completed) == sorted(schedule.completed)
+
+
+def test_late_start_replaces_the_forecast_made_at_setup():
+    engine = configured_engine()
+    schedule = DaySchedule()
+    schedule.plan(engine, THIRD, until=DAY)  # forecast as if it ran from setup
+
+    started = 40 * 60
+    schedule.plan(engine, started + THIRD, until=DAY)
+
+    assert schedule.pomodoro_end(1) == started + CYCLE
+    assert schedule.pomodoros_by(started + 60) == 0
+    assert list(schedule.completed) == sorted(schedule.completed)
+
+
+def test_long_pause_shifts_everything_after_it():
+    engine = configured_engine()
+    schedule = DaySchedule()
+    schedule.plan(engine, THIRD, until=DAY)
+
+    # Paused 100 s into the first interval for an hour
+    engine.time_remaining = THIRD - 100
+    resumed = 100 + 3600
+    schedule.plan(engine, resumed + engine.time_remaining, until=DAY)
+
+    assert schedule.pomodoro_end(1) == resumed + (THIRD - 100) + 2 * THIRD + BREAK
+    assert schedule.pomodoros_by(resumed) == 0
+    assert list(schedule.completed) == sorted(schedule.completed)
+
+
+def test_restart_forgets_the_previous_day():
+    engine = configured_engine()
+    schedule = DaySchedule()
+    for _ in range(3 * 4):
+        engine.advance()
+    schedule.plan(engine, engine.time_remaining, until=DAY)
+    assert schedule.pomodoro_end(4) is not None
+
+    engine.reset_day()
+    schedule.clear()
+    assert schedule.pomodoro_end(1) is None
+    assert schedule.pomodoros_by(0) is None
+
+    restarted = 5 * 3600
+    schedule.plan(engine, restarted + engine.time_remaining, until=restarted + DAY)
+    assert schedule.pomodoro_end(1) > restarted
+    assert schedule.pomodoros_by(restarted) == 0
+
+
+def test_plan_stops_for_an_unconfigured_engine():
+    schedule = DaySchedule()
+    schedule.plan(PomodoroEngine(lambda: 0), 0, until=DAY)
+    assert len(schedule.ends) == 1